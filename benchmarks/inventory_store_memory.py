@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""
+Peak RSS of holding a synthetic EC2 inventory in memory (the scanner's
+``json.dumps(indent=2)`` path) versus spilling it to an InventoryStore and
+reading it back lazily.
+
+Usage: python benchmarks/inventory_store_memory.py [<resources> ...]
+"""
+import os
+import sys
+import json
+import resource
+import multiprocessing
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from aws_infrastructure_security_audit_and_reporting.inventory_store import InventoryStore
+from aws_infrastructure_security_audit_and_reporting.serialization import DateTimeEncoder
+
+
+def fake_instance(i):
+    return {
+        'InstanceId': f'i-{i:017x}',
+        'InstanceType': 'm5.large',
+        'LaunchTime': datetime(2026, 1, 1, tzinfo=timezone.utc),
+        'PrivateIpAddress': f'10.0.{i // 256 % 256}.{i % 256}',
+        'SecurityGroups': [{'GroupId': f'sg-{i % 50:017x}', 'GroupName': 'default'}],
+        'Tags': [{'Key': 'Name', 'Value': f'instance-{i}'}, {'Key': 'team', 'Value': 'platform'}],
+        'BlockDeviceMappings': [{'DeviceName': '/dev/xvda', 'Ebs': {'VolumeId': f'vol-{i:017x}'}}],
+    }
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def in_memory(n, queue):
+    instances = [fake_instance(i) for i in range(n)]
+    payload = json.dumps({'instances': instances}, indent=2, cls=DateTimeEncoder)
+    queue.put((len(payload), peak_rss_mb()))
+
+
+def spilled(n, queue):
+    with InventoryStore() as store:
+        for i in range(n):
+            store.append({'service': 'ec2', 'resource_type': 'instances',
+                          'resource_id': f'i-{i:017x}', 'resource': fake_instance(i)})
+        size = os.path.getsize(store.path)
+        # Consume every record, as the Parquet export does
+        count = sum(1 for _ in store)
+        assert count == n
+        queue.put((size, peak_rss_mb()))
+
+
+def idle(n, queue):
+    queue.put((0, peak_rss_mb()))
+
+
+def measure(target, n):
+    # One child per measurement so ru_maxrss reflects only that mode
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=target, args=(n, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+    baseline = measure(idle, 0)[1]
+    print(f"baseline interpreter RSS: {baseline:.1f} MB")
+    print(f"{'resources':>10} {'in-memory MB':>14} {'spilled MB':>12} {'bytes on disk':>14}")
+    for n in sizes:
+        _, memory_rss = measure(in_memory, n)
+        disk_bytes, store_rss = measure(spilled, n)
+        print(f"{n:>10} {memory_rss:>14.1f} {store_rss:>12.1f} {disk_bytes:>14}")
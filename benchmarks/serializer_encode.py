@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+"""
+Encode time and output size of the scanner's JSON serialization across
+inventory sizes: the original ``json.dumps(indent=2, cls=DateTimeEncoder)``
+versus each installed backend in serialization.py.
+
+Usage: python benchmarks/serializer_encode.py [<resources> ...]
+"""
+import os
+import sys
+import json
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from aws_infrastructure_security_audit_and_reporting.serialization import (
+    AVAILABLE,
+    DateTimeEncoder,
+    get_serializer,
+)
+from inventory_store_memory import fake_instance
+
+
+def best_of(fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), output
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100, 1000, 10000, 50000]
+    encoders = {'indent=2 (original)': lambda obj: json.dumps(obj, indent=2, cls=DateTimeEncoder).encode('utf-8')}
+    for name, available in AVAILABLE.items():
+        if available:
+            encoders[name] = get_serializer(name).dumps_bytes
+
+    print(f"{'resources':>10} {'backend':>20} {'encode ms':>10} {'bytes':>12} {'speedup':>8}")
+    for n in sizes:
+        inventory = {'ec2': {'instances': [fake_instance(i) for i in range(n)]}}
+        baseline = None
+        for name, encode in encoders.items():
+            seconds, output = best_of(lambda: encode(inventory))
+            baseline = baseline or seconds
+            print(f"{n:>10} {name:>20} {seconds * 1000:>10.2f} {len(output):>12} {baseline / seconds:>7.1f}x")
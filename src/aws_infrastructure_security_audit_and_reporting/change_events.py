@@ -0,0 +1,226 @@
+import os
+import json
+import logging
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from aws_infrastructure_security_audit_and_reporting.findings import evaluate_resources
+from aws_infrastructure_security_audit_and_reporting.inventory import iter_resources
+
+logger = logging.getLogger(__name__)
+
+CLOUDTRAIL_DETAIL_TYPE = 'AWS API Call via CloudTrail'
+CONFIG_DETAIL_TYPE = 'Config Configuration Item Change'
+
+
+def _request(*keys):
+    return lambda detail: [(detail.get('requestParameters') or {}).get(key) for key in keys]
+
+
+def _response(*keys):
+    return lambda detail: [(detail.get('responseElements') or {}).get(key) for key in keys]
+
+
+def _launched_instances(detail):
+    items = ((detail.get('responseElements') or {}).get('instancesSet') or {}).get('items', [])
+    return [item.get('instanceId') for item in items]
+
+
+# CloudTrail eventName -> (service, resource_type, resource id extractor)
+CLOUDTRAIL_EVENTS = {
+    'AuthorizeSecurityGroupIngress': ('ec2', 'security_groups', _request('groupId')),
+    'AuthorizeSecurityGroupEgress': ('ec2', 'security_groups', _request('groupId')),
+    'RevokeSecurityGroupIngress': ('ec2', 'security_groups', _request('groupId')),
+    'RevokeSecurityGroupEgress': ('ec2', 'security_groups', _request('groupId')),
+    'ModifySecurityGroupRules': ('ec2', 'security_groups', _request('GroupId', 'groupId')),
+    'CreateSecurityGroup': ('ec2', 'security_groups', _response('groupId')),
+    'RunInstances': ('ec2', 'instances', _launched_instances),
+    'ModifyInstanceAttribute': ('ec2', 'instances', _request('instanceId')),
+    'ModifyInstanceMetadataOptions': ('ec2', 'instances', _request('instanceId')),
+    'CreateBucket': ('s3', 'buckets', _request('bucketName')),
+    'PutBucketPolicy': ('s3', 'buckets', _request('bucketName')),
+    'DeleteBucketPolicy': ('s3', 'buckets', _request('bucketName')),
+    'PutBucketAcl': ('s3', 'buckets', _request('bucketName')),
+    'PutBucketEncryption': ('s3', 'buckets', _request('bucketName')),
+    'DeleteBucketEncryption': ('s3', 'buckets', _request('bucketName')),
+    'PutBucketPublicAccessBlock': ('s3', 'buckets', _request('bucketName')),
+    'DeleteBucketPublicAccessBlock': ('s3', 'buckets', _request('bucketName')),
+    'CreateDBInstance': ('rds', 'instances', _request('dBInstanceIdentifier')),
+    'ModifyDBInstance': ('rds', 'instances', _request('dBInstanceIdentifier')),
+    'CreateNetworkAclEntry': ('vpc', 'network_acls', _request('networkAclId')),
+    'ReplaceNetworkAclEntry': ('vpc', 'network_acls', _request('networkAclId')),
+    'DeleteNetworkAclEntry': ('vpc', 'network_acls', _request('networkAclId')),
+    'CreateUser': ('iam', 'users', _request('userName')),
+    'AttachUserPolicy': ('iam', 'users', _request('userName')),
+    'PutUserPolicy': ('iam', 'users', _request('userName')),
+    'CreateRole': ('iam', 'roles', _request('roleName')),
+    'AttachRolePolicy': ('iam', 'roles', _request('roleName')),
+    'PutRolePolicy': ('iam', 'roles', _request('roleName')),
+    'UpdateAssumeRolePolicy': ('iam', 'roles', _request('roleName')),
+    'StopLogging': ('cloudtrail', 'trails', _request('name')),
+    'UpdateTrail': ('cloudtrail', 'trails', _request('name')),
+    'DisableKeyRotation': ('kms', 'keys', _request('keyId')),
+    'ModifySnapshotAttribute': ('ebs', 'snapshots', _request('snapshotId')),
+    'ModifyLoadBalancerAttributes': ('elbv2', 'load_balancers', _request('loadBalancerArn')),
+    'UpdateFunctionConfiguration20150331v2': ('lambda', 'functions', _request('functionName')),
+    'UpdateRestApi': ('apigateway', 'rest_apis', _request('restApiId')),
+}
+
+# AWS Config resourceType -> (service, resource_type, configurationItem id field)
+CONFIG_RESOURCE_TYPES = {
+    'AWS::EC2::SecurityGroup': ('ec2', 'security_groups', 'resourceId'),
+    'AWS::EC2::Instance': ('ec2', 'instances', 'resourceId'),
+    'AWS::EC2::NetworkAcl': ('vpc', 'network_acls', 'resourceId'),
+    'AWS::S3::Bucket': ('s3', 'buckets', 'resourceName'),
+    'AWS::RDS::DBInstance': ('rds', 'instances', 'resourceName'),
+    'AWS::IAM::User': ('iam', 'users', 'resourceName'),
+    'AWS::IAM::Role': ('iam', 'roles', 'resourceName'),
+    'AWS::ElasticLoadBalancingV2::LoadBalancer': ('elbv2', 'load_balancers', 'resourceId'),
+    'AWS::Lambda::Function': ('lambda', 'functions', 'resourceName'),
+    'AWS::ApiGateway::RestApi': ('apigateway', 'rest_apis', 'resourceId'),
+    'AWS::KMS::Key': ('kms', 'keys', 'resourceId'),
+    'AWS::CloudTrail::Trail': ('cloudtrail', 'trails', 'resourceName'),
+}
+
+# Coalesced targets: (region, service, resource_type) -> resource ids
+Targets = Dict[Tuple[str, str, str], Set[str]]
+
+
+def _sqs_messages(event: Dict) -> Iterator[Tuple[Optional[str], Dict]]:
+    """Yield (messageId, parsed body) for each SQS record whose body is a JSON event."""
+    for record in event.get('Records', []):
+        try:
+            body = json.loads(record.get('body') or '')
+        except ValueError:
+            body = None
+        if not isinstance(body, dict):
+            # Deleted from the queue as processed: retrying can't make it parse
+            logger.warning(f"Skipping SQS message {record.get('messageId')}: body is not a JSON event")
+            continue
+        yield record.get('messageId'), body
+
+
+def unwrap_events(event: Dict) -> List[Dict]:
+    """
+    Normalise the supported envelopes into a flat list of EventBridge events:
+    an SQS batch (``Records`` with JSON bodies), a replay batch (``events``),
+    or a single EventBridge event. Unparseable SQS bodies are logged and skipped.
+    """
+    if 'Records' in event:
+        return [body for _, body in _sqs_messages(event)]
+    if 'events' in event:
+        return list(event['events'])
+    if 'detail-type' in event:
+        return [event]
+    return []
+
+
+def is_change_event_batch(event: Dict) -> bool:
+    # Only the change events queue feeds SQS batches, even ones with no usable body
+    if any(record.get('eventSource') == 'aws:sqs' for record in event.get('Records', [])):
+        return True
+    return any(
+        e.get('detail-type') in (CLOUDTRAIL_DETAIL_TYPE, CONFIG_DETAIL_TYPE)
+        for e in unwrap_events(event)
+    )
+
+
+def _event_targets(event: Dict) -> Iterator[Tuple[str, str, str, str]]:
+    detail = event.get('detail') or {}
+    region = event.get('region') or detail.get('awsRegion') or os.getenv('AWS_REGION_NAME', 'us-west-2')
+
+    if event.get('detail-type') == CLOUDTRAIL_DETAIL_TYPE:
+        if detail.get('errorCode'):
+            return  # Failed API calls change nothing
+        mapping = CLOUDTRAIL_EVENTS.get(detail.get('eventName'))
+        if mapping:
+            service, resource_type, extract = mapping
+            for resource_id in extract(detail):
+                if resource_id:
+                    yield region, service, resource_type, resource_id
+
+    elif event.get('detail-type') == CONFIG_DETAIL_TYPE:
+        item = detail.get('configurationItem') or {}
+        mapping = CONFIG_RESOURCE_TYPES.get(item.get('resourceType'))
+        if mapping and item.get('configurationItemStatus') != 'ResourceDeleted':
+            service, resource_type, id_field = mapping
+            if item.get(id_field):
+                yield item.get('awsRegion', region), service, resource_type, item[id_field]
+
+
+def coalesce(events: List[Dict]) -> Targets:
+    """
+    Deduplicate events by id and collapse repeated changes to the same resource
+    into a single re-scan target.
+    """
+    seen = set()
+    targets: Targets = defaultdict(set)
+    for event in events:
+        event_id = event.get('id') or (event.get('detail') or {}).get('eventID')
+        if event_id:
+            if event_id in seen:
+                continue
+            seen.add(event_id)
+        for region, service, resource_type, resource_id in _event_targets(event):
+            targets[(region, service, resource_type)].add(resource_id)
+    return targets
+
+
+def failed_message_ids(event: Dict, failed_targets: List[Dict]) -> List[str]:
+    """SQS message ids whose events touch any of the targets that failed to re-scan."""
+    failed = {
+        (target['region'], target['service'], target['resource_type'], resource_id)
+        for target in failed_targets
+        for resource_id in target['resource_ids']
+    }
+    return [
+        message_id
+        for message_id, body in _sqs_messages(event)
+        if message_id and any(target in failed for target in _event_targets(body))
+    ]
+
+
+def _target_list(targets: Targets) -> List[Dict]:
+    return [
+        {'region': region, 'service': service, 'resource_type': resource_type, 'resource_ids': sorted(ids)}
+        for (region, service, resource_type), ids in sorted(targets.items())
+    ]
+
+
+def process_change_events(event: Dict) -> Dict:
+    """Re-scan and evaluate only the resources touched by a batch of change events."""
+    # Imported here so parsing and coalescing don't need boto3 or CrewAI
+    from aws_infrastructure_security_audit_and_reporting.tools.aws_infrastructure_scanner_tool import (
+        AWSInfrastructureScannerTool,
+    )
+
+    events = unwrap_events(event)
+    targets = coalesce(events)
+    scanner = AWSInfrastructureScannerTool()
+
+    resources = 0
+    findings = []
+    failed: Targets = {}
+    for (region, service, resource_type), resource_ids in sorted(targets.items()):
+        try:
+            scan_result = scanner._scan_resources(service, resource_type, sorted(resource_ids), region)
+        except Exception as e:
+            logger.error(f"Error re-scanning {service}/{resource_type} in {region}: {e}")
+            failed[(region, service, resource_type)] = resource_ids
+            continue
+        records = list(iter_resources(service, scan_result))
+        resources += len(records)
+        for finding in evaluate_resources(records):
+            findings.append(dict(finding, region=region))
+
+    logger.info(
+        f"Coalesced {len(events)} change events into {sum(len(ids) for ids in targets.values())} "
+        f"targets; re-scanned {resources} resources with {len(findings)} findings"
+    )
+    return {
+        'events': len(events),
+        'targets': _target_list(targets),
+        'failed_targets': _target_list(failed),
+        'resources_scanned': resources,
+        'findings': findings,
+    }
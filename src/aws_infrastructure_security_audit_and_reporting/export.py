@@ -0,0 +1,155 @@
+import os
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import boto3
+
+from aws_infrastructure_security_audit_and_reporting.findings import evaluate_resource
+from aws_infrastructure_security_audit_and_reporting.serialization import dumps
+from aws_infrastructure_security_audit_and_reporting.tools.aws_infrastructure_scanner_tool import AWSInfrastructureScannerTool
+
+# Optional import: the columnar export is skipped when pyarrow is not installed
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+PARTITION_COLUMNS = ['account_id', 'region', 'date']
+RECORD_COLUMNS = {
+    'inventory': ['run_id', 'scanned_at', 'service', 'resource_type', 'resource_id', 'resource'],
+    'findings': ['run_id', 'scanned_at', 'service', 'resource_type', 'resource_id',
+                 'rule_id', 'severity', 'title'],
+}
+
+
+class ParquetDatasetWriter:
+    """
+    Streams rows into one Parquet file inside a Hive-style partition
+    (``<dataset>/account_id=.../region=.../date=YYYY-MM-DD/<run_id>.parquet``).
+
+    Rows are buffered up to ``batch_size`` and flushed as a row group, so memory
+    stays bounded regardless of how many resources a scan returns.
+    """
+
+    def __init__(self, base_dir: str, dataset: str, partition: Dict[str, str],
+                 run_id: str, batch_size: int = 1000) -> None:
+        self.columns = RECORD_COLUMNS[dataset]
+        self.schema = pa.schema([(name, pa.string()) for name in self.columns])
+        partition_dir = os.path.join(
+            base_dir, dataset, *[f"{key}={partition[key]}" for key in PARTITION_COLUMNS]
+        )
+        self.path = os.path.join(partition_dir, f"{run_id}.parquet")
+        self.batch_size = batch_size
+        self.rows_written = 0
+        self._buffer: List[Dict] = []
+        self._writer = None
+
+    def write(self, row: Dict) -> None:
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        if self._writer is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._writer = pq.ParquetWriter(self.path, self.schema, compression='zstd')
+        batch = pa.RecordBatch.from_pydict(
+            {name: [row.get(name) for row in self._buffer] for name in self.columns},
+            schema=self.schema
+        )
+        self._writer.write_batch(batch)
+        self.rows_written += len(self._buffer)
+        self._buffer = []
+
+    def close(self) -> Optional[str]:
+        """Flush remaining rows; returns the file path, or None if nothing was written."""
+        self.flush()
+        if self._writer is None:
+            return None
+        self._writer.close()
+        self._writer = None
+        return self.path
+
+    def abort(self) -> None:
+        """Discard buffered rows and close and remove a partly written file; no-op after ``close``."""
+        self._buffer = []
+        if self._writer is None:
+            return
+        self._writer.close()
+        self._writer = None
+        os.remove(self.path)
+
+
+def export_audit_data(output_dir: str, scanner: Optional[AWSInfrastructureScannerTool] = None,
+                      region: Optional[str] = None, account_id: Optional[str] = None,
+                      deadline: Optional[float] = None) -> List[str]:
+    """
+    Stream the run's full inventory, with baseline findings, to partitioned
+    Parquet under ``output_dir``.
+
+    Pass the ``scanner`` the crew used: whatever it already spilled to its
+    inventory is exported as-is, and only services it did not scan are
+    collected now (concurrently, and not started after ``deadline``, a
+    ``time.monotonic()`` value). Records are read back from disk one at a
+    time, so memory does not grow with account size.
+
+    Returns the paths of the written files (empty if pyarrow is unavailable).
+    """
+    if not PYARROW_AVAILABLE:
+        logger.warning("pyarrow is not installed; skipping Parquet export")
+        return []
+
+    region = region or os.getenv('AWS_REGION_NAME', 'us-west-2')
+    account_id = account_id or boto3.client('sts').get_caller_identity()['Account']
+    now = datetime.now(timezone.utc)
+    run_id = now.strftime("%Y-%m-%d-%H-%M-%S")
+    scanned_at = now.isoformat()
+    date = now.strftime("%Y-%m-%d")
+
+    owns_scanner = scanner is None
+    scanner = scanner or AWSInfrastructureScannerTool()
+    writers: Dict[Tuple[str, str], ParquetDatasetWriter] = {}
+
+    def writer(dataset: str, partition_region: str) -> ParquetDatasetWriter:
+        if (dataset, partition_region) not in writers:
+            partition = {'account_id': account_id, 'region': partition_region, 'date': date}
+            writers[(dataset, partition_region)] = ParquetDatasetWriter(output_dir, dataset, partition, run_id)
+        return writers[(dataset, partition_region)]
+
+    try:
+        scanner.collect_all([region], deadline)
+        for entry in scanner.inventory.entries():
+            if entry.error:
+                logger.error(f"Exporting partial inventory for {entry.service} in {entry.region}: {entry.error}")
+            inventory = writer('inventory', entry.region)
+            findings = writer('findings', entry.region)
+            for record in entry.store:
+                row = {
+                    'run_id': run_id,
+                    'scanned_at': scanned_at,
+                    'service': record['service'],
+                    'resource_type': record['resource_type'],
+                    'resource_id': record['resource_id'],
+                }
+                inventory.write(dict(row, resource=dumps(record['resource'])))
+                for finding in evaluate_resource(record):
+                    findings.write(dict(row, **finding))
+        paths = [path for path in (w.close() for w in writers.values()) if path]
+    finally:
+        # Only does anything if the export failed part way
+        for w in writers.values():
+            w.abort()
+        if owns_scanner:
+            scanner.inventory.close()
+
+    resources = sum(w.rows_written for (dataset, _), w in writers.items() if dataset == 'inventory')
+    findings_count = sum(w.rows_written for (dataset, _), w in writers.items() if dataset == 'findings')
+    logger.info(f"Exported {resources} resources and {findings_count} findings to {output_dir}")
+    return paths
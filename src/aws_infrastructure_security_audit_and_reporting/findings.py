@@ -0,0 +1,152 @@
+from typing import Dict, Iterable, Iterator, List
+
+PUBLIC_CIDRS = ('0.0.0.0/0', '::/0')
+WEB_PORTS = (80, 443)
+
+
+def _finding(record: Dict, rule_id: str, severity: str, title: str) -> Dict:
+    return {
+        'service': record['service'],
+        'resource_type': record['resource_type'],
+        'resource_id': record['resource_id'],
+        'rule_id': rule_id,
+        'severity': severity,
+        'title': title,
+    }
+
+
+def _is_public_permission(permission: Dict) -> bool:
+    cidrs = [r.get('CidrIp') for r in permission.get('IpRanges', [])]
+    cidrs += [r.get('CidrIpv6') for r in permission.get('Ipv6Ranges', [])]
+    return any(cidr in PUBLIC_CIDRS for cidr in cidrs)
+
+
+def _check_security_group(record: Dict) -> List[Dict]:
+    findings = []
+    for permission in record['resource'].get('IpPermissions', []):
+        if not _is_public_permission(permission):
+            continue
+        from_port = permission.get('FromPort')
+        to_port = permission.get('ToPort')
+        if permission.get('IpProtocol') == '-1' or from_port is None:
+            findings.append(_finding(record, 'EC2.SG.ALL_TRAFFIC_PUBLIC', 'CRITICAL',
+                                     'Security group allows all traffic from the internet'))
+        elif not (from_port == to_port and from_port in WEB_PORTS):
+            findings.append(_finding(record, 'EC2.SG.PORT_PUBLIC', 'HIGH',
+                                     f'Security group allows ports {from_port}-{to_port} from the internet'))
+    return findings
+
+
+def _check_instance(record: Dict) -> List[Dict]:
+    findings = []
+    instance = record['resource']
+    if instance.get('MetadataOptions', {}).get('HttpTokens') != 'required':
+        findings.append(_finding(record, 'EC2.INSTANCE.IMDSV1', 'MEDIUM',
+                                 'Instance does not require IMDSv2'))
+    if instance.get('PublicIpAddress'):
+        findings.append(_finding(record, 'EC2.INSTANCE.PUBLIC_IP', 'LOW',
+                                 'Instance has a public IP address'))
+    return findings
+
+
+PUBLIC_ACCESS_BLOCK_SETTINGS = ('BlockPublicAcls', 'IgnorePublicAcls', 'BlockPublicPolicy', 'RestrictPublicBuckets')
+
+
+def _check_bucket(record: Dict) -> List[Dict]:
+    findings = []
+    bucket = record['resource']
+    if not bucket.get('encryption'):
+        findings.append(_finding(record, 'S3.BUCKET.UNENCRYPTED', 'HIGH',
+                                 'Bucket has no default encryption configured'))
+    if bucket.get('policy_is_public'):
+        findings.append(_finding(record, 'S3.BUCKET.POLICY_PUBLIC', 'CRITICAL',
+                                 'Bucket policy grants public access'))
+    if bucket.get('acl_is_public'):
+        findings.append(_finding(record, 'S3.BUCKET.ACL_PUBLIC', 'HIGH',
+                                 'Bucket ACL grants access to all users'))
+    block = bucket.get('public_access_block') or {}
+    if not all(block.get(setting) for setting in PUBLIC_ACCESS_BLOCK_SETTINGS):
+        findings.append(_finding(record, 'S3.BUCKET.PUBLIC_ACCESS_NOT_BLOCKED', 'MEDIUM',
+                                 'Bucket does not block all public access'))
+    return findings
+
+
+def _check_db_instance(record: Dict) -> List[Dict]:
+    findings = []
+    db = record['resource']
+    if not db.get('StorageEncrypted'):
+        findings.append(_finding(record, 'RDS.INSTANCE.UNENCRYPTED', 'HIGH',
+                                 'Database storage is not encrypted'))
+    if db.get('PubliclyAccessible'):
+        findings.append(_finding(record, 'RDS.INSTANCE.PUBLIC', 'HIGH',
+                                 'Database instance is publicly accessible'))
+    return findings
+
+
+def _check_network_acl(record: Dict) -> List[Dict]:
+    for entry in record['resource'].get('Entries', []):
+        if (not entry.get('Egress') and entry.get('RuleAction') == 'allow'
+                and entry.get('Protocol') == '-1'
+                and (entry.get('CidrBlock') in PUBLIC_CIDRS or entry.get('Ipv6CidrBlock') in PUBLIC_CIDRS)):
+            return [_finding(record, 'VPC.NACL.ALL_TRAFFIC_PUBLIC', 'MEDIUM',
+                             'Network ACL allows all inbound traffic from the internet')]
+    return []
+
+
+def _check_snapshot(record: Dict) -> List[Dict]:
+    findings = []
+    snapshot = record['resource']
+    if snapshot.get('Public'):
+        findings.append(_finding(record, 'EBS.SNAPSHOT.PUBLIC', 'CRITICAL',
+                                 'EBS snapshot is publicly restorable'))
+    if not snapshot.get('Encrypted'):
+        findings.append(_finding(record, 'EBS.SNAPSHOT.UNENCRYPTED', 'MEDIUM',
+                                 'EBS snapshot is not encrypted'))
+    return findings
+
+
+def _check_trail(record: Dict) -> List[Dict]:
+    findings = []
+    trail = record['resource']
+    if trail.get('IsLogging') is False:
+        findings.append(_finding(record, 'CLOUDTRAIL.TRAIL.NOT_LOGGING', 'HIGH',
+                                 'CloudTrail trail is not logging'))
+    if not trail.get('IsMultiRegionTrail'):
+        findings.append(_finding(record, 'CLOUDTRAIL.TRAIL.SINGLE_REGION', 'MEDIUM',
+                                 'CloudTrail trail does not cover all regions'))
+    if not trail.get('LogFileValidationEnabled'):
+        findings.append(_finding(record, 'CLOUDTRAIL.TRAIL.NO_LOG_VALIDATION', 'MEDIUM',
+                                 'CloudTrail log file validation is disabled'))
+    return findings
+
+
+def _check_key(record: Dict) -> List[Dict]:
+    # Only set for customer-managed symmetric keys with KMS-generated material, where rotation applies
+    if record['resource'].get('KeyRotationEnabled') is False:
+        return [_finding(record, 'KMS.KEY.NO_ROTATION', 'MEDIUM',
+                         'Customer-managed KMS key does not have rotation enabled')]
+    return []
+
+
+# Baseline checks keyed by (service, resource_type); the LLM analysis goes deeper
+CHECKS = {
+    ('ec2', 'security_groups'): _check_security_group,
+    ('ec2', 'instances'): _check_instance,
+    ('s3', 'buckets'): _check_bucket,
+    ('rds', 'instances'): _check_db_instance,
+    ('vpc', 'network_acls'): _check_network_acl,
+    ('ebs', 'snapshots'): _check_snapshot,
+    ('cloudtrail', 'trails'): _check_trail,
+    ('kms', 'keys'): _check_key,
+}
+
+
+def evaluate_resource(record: Dict) -> List[Dict]:
+    """Run the baseline checks for a single resource record from ``iter_resources``."""
+    check = CHECKS.get((record['service'], record['resource_type']))
+    return check(record) if check else []
+
+
+def evaluate_resources(records: Iterable[Dict]) -> Iterator[Dict]:
+    for record in records:
+        yield from evaluate_resource(record)
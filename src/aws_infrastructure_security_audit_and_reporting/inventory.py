@@ -0,0 +1,45 @@
+from typing import Dict, Iterator, Optional
+
+from aws_infrastructure_security_audit_and_reporting.tools.collectors import COLLECTORS
+
+# Keys that identify a resource, checked in order, per (service, resource_type)
+RESOURCE_ID_KEYS = {
+    (name, call.resource_type): list(call.id_keys)
+    for name, collector in COLLECTORS.items()
+    for call in collector.calls
+}
+
+
+def resource_id(service: str, resource_type: str, resource: Dict) -> Optional[str]:
+    """Best-effort stable identifier for a scanned resource."""
+    for key in RESOURCE_ID_KEYS.get((service, resource_type), []):
+        if resource.get(key):
+            return str(resource[key])
+    for key in ('Arn', 'Id', 'Name', 'name'):
+        if resource.get(key):
+            return str(resource[key])
+    return None
+
+
+def iter_resources(service: str, scan_result: Dict) -> Iterator[Dict]:
+    """
+    Flatten one service's scanner output into individual resource records.
+
+    Yields dicts with ``service``, ``resource_type``, ``resource_id`` and the raw
+    ``resource``. EC2 reservations are unwrapped into their instances.
+    """
+    for resource_type, resources in scan_result.items():
+        if not isinstance(resources, list):
+            continue
+        for resource in resources:
+            if service == 'ec2' and resource_type == 'instances' and 'Instances' in resource:
+                nested = resource['Instances']
+            else:
+                nested = [resource]
+            for item in nested:
+                yield {
+                    'service': service,
+                    'resource_type': resource_type,
+                    'resource_id': resource_id(service, resource_type, item),
+                    'resource': item,
+                }
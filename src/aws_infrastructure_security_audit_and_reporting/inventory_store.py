@@ -0,0 +1,207 @@
+import os
+import mmap
+import struct
+import tempfile
+import threading
+from array import array
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from aws_infrastructure_security_audit_and_reporting.inventory import iter_resources
+from aws_infrastructure_security_audit_and_reporting.serialization import dumps_bytes, loads
+
+# Each record is a 4-byte big-endian length followed by a compact JSON payload
+# (encoded with the configured JSON backend, see serialization.py)
+_HEADER = struct.Struct('>I')
+
+# Mapped pages already read are released every this many bytes during iteration
+_RELEASE_EVERY = 8 * 1024 * 1024
+
+
+class InventoryStore:
+    """
+    Append-only, length-prefixed log of resource records spilled to local disk
+    (``/tmp`` in Lambda) so a full inventory never has to live in memory.
+
+    Only an offset index (8 bytes per record) is kept in memory. Reads go through
+    a memory map and decode one record at a time, so peak RSS stays flat however
+    many resources are scanned.
+    """
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        directory = directory or os.environ.get('INVENTORY_STORE_DIR', tempfile.gettempdir())
+        fd, self.path = tempfile.mkstemp(prefix='inventory-', suffix='.log', dir=directory)
+        self._file = os.fdopen(fd, 'wb')
+        self._offsets = array('Q')
+        self._size = 0
+        self._mmap = None
+        self._mapped_size = 0
+
+    def append(self, record: Dict) -> None:
+        payload = dumps_bytes(record)
+        self._offsets.append(self._size)
+        self._file.write(_HEADER.pack(len(payload)))
+        self._file.write(payload)
+        self._size += _HEADER.size + len(payload)
+
+    def extend(self, records) -> None:
+        for record in records:
+            self.append(record)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def _view(self) -> mmap.mmap:
+        """
+        Map the log for reading, remapping if records were appended since. The
+        previous map is not closed here: an iterator may still be reading it,
+        and it is unmapped once the last reference is dropped.
+        """
+        if self._mmap is None or self._mapped_size != self._size:
+            self._file.flush()
+            with open(self.path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapped_size = self._size
+        return self._mmap
+
+    def _read_at(self, view: mmap.mmap, offset: int) -> Dict:
+        (length,) = _HEADER.unpack_from(view, offset)
+        start = offset + _HEADER.size
+        return loads(view[start:start + length])
+
+    def __getitem__(self, index: int) -> Dict:
+        offset = self._offsets[index]
+        return self._read_at(self._view(), offset)
+
+    def __iter__(self) -> Iterator[Dict]:
+        """
+        Yield the records present when iteration starts. Records appended while
+        iterating are not visible to this iterator (the mapped view ends at the
+        snapshot), so appends during a pass are safe.
+        """
+        count = len(self._offsets)
+        if not count:
+            return
+        view = self._view()
+        released = 0
+        for index in range(count):
+            offset = self._offsets[index]
+            yield self._read_at(view, offset)
+            # Drop pages behind the cursor so a full scan doesn't accumulate in RSS
+            if offset - released >= _RELEASE_EVERY and hasattr(mmap, 'MADV_DONTNEED'):
+                end = offset - offset % mmap.PAGESIZE
+                view.madvise(mmap.MADV_DONTNEED, released, end - released)
+                released = end
+
+    def close(self) -> None:
+        """Release the map and delete the spill file."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if not self._file.closed:
+            self._file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self) -> 'InventoryStore':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ServiceInventory:
+    """
+    One service's full inventory in one region: every record spilled to an
+    InventoryStore, plus per-type counts and the first few resources of each
+    type kept in memory for a compact summary.
+    """
+
+    def __init__(self, service: str, region: str, sample_size: int, directory: Optional[str] = None) -> None:
+        self.service = service
+        self.region = region
+        self.sample_size = sample_size
+        self.store = InventoryStore(directory)
+        self.counts: Dict[str, int] = {}
+        self.samples: Dict[str, List[Dict]] = {}
+        self.error: Optional[str] = None
+
+    def spill(self, pages: Iterable[Tuple[str, List[Dict]]]) -> None:
+        """Consume (resource_type, page) pairs, as yielded by ``ServiceCollector.iter_pages``."""
+        for resource_type, page in pages:
+            self.counts.setdefault(resource_type, 0)
+            sample = self.samples.setdefault(resource_type, [])
+            for record in iter_resources(self.service, {resource_type: page}):
+                self.store.append(record)
+                self.counts[resource_type] += 1
+                if len(sample) < self.sample_size:
+                    sample.append(record['resource'])
+
+    def summary(self) -> Dict:
+        """
+        Bounded view for the agent: up to ``sample_size`` resources per type and
+        the full count of each type (plus ``error`` if the scan stopped early).
+        """
+        result: Dict = dict(self.samples)
+        result['resource_counts'] = dict(self.counts)
+        if self.error:
+            result['error'] = self.error
+        return result
+
+
+class ScanInventory:
+    """
+    The inventories scanned during one audit run, keyed by (service, region).
+
+    The scanner tool and the Parquet export share an instance, so each service
+    is listed from AWS once per run however many times it is asked for.
+    Concurrent requests for the same key wait for the first scan to finish.
+    """
+
+    def __init__(self, sample_size: int = 5, directory: Optional[str] = None) -> None:
+        self.sample_size = sample_size
+        self.directory = directory
+        self._entries: Dict[Tuple[str, str], ServiceInventory] = {}
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def collect(self, service: str, region: str,
+                pages: Callable[[], Iterable[Tuple[str, List[Dict]]]]) -> ServiceInventory:
+        """Return the inventory for (service, region), spilling ``pages()`` the first time."""
+        key = (service, region)
+        with self._lock:
+            key_lock = self._locks.setdefault(key, threading.Lock())
+        with key_lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = ServiceInventory(service, region, self.sample_size, self.directory)
+                try:
+                    entry.spill(pages())
+                except Exception as e:
+                    # Keep what was spilled; one failing service (e.g. missing
+                    # permissions) shouldn't sink the whole scan
+                    entry.error = f'Error scanning {service}: {str(e)}'
+                with self._lock:
+                    self._entries[key] = entry
+            return entry
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def entries(self) -> List[ServiceInventory]:
+        with self._lock:
+            return list(self._entries.values())
+
+    def close(self) -> None:
+        """Delete every spill file."""
+        for entry in self.entries():
+            entry.store.close()
+        with self._lock:
+            self._entries.clear()
+
+    def __enter__(self) -> 'ScanInventory':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
@@ -0,0 +1,416 @@
+import os
+import time
+import logging
+import threading
+import contextvars
+import urllib.request
+import concurrent.futures
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import (
+    ClientError,
+    ConnectTimeoutError,
+    ConnectionClosedError,
+    EndpointConnectionError,
+    ReadTimeoutError,
+)
+from crewai import LLM
+from crewai.llms.base_llm import BaseLLM
+from pydantic import PrivateAttr
+
+# Optional imports for environments where they're not available
+try:
+    from langchain_community.llms import LlamaCpp
+    LLAMA_CPP_AVAILABLE = True
+except ImportError:
+    LLAMA_CPP_AVAILABLE = False
+
+try:
+    from litellm.exceptions import (
+        APIConnectionError as LiteLLMConnectionError,
+        RateLimitError as LiteLLMRateLimitError,
+        ServiceUnavailableError as LiteLLMServiceUnavailableError,
+        Timeout as LiteLLMTimeout,
+    )
+    LITELLM_TIMEOUTS = (LiteLLMTimeout, LiteLLMRateLimitError, LiteLLMServiceUnavailableError)
+    LITELLM_CONNECTION_ERRORS = (LiteLLMConnectionError,)
+except ImportError:
+    LITELLM_TIMEOUTS = ()
+    LITELLM_CONNECTION_ERRORS = ()
+
+logger = logging.getLogger(__name__)
+
+# Slow or overloaded backend: fail over, keep the backend in rotation
+TIMEOUT_EXCEPTIONS = (
+    TimeoutError, concurrent.futures.TimeoutError, ConnectTimeoutError, ReadTimeoutError
+) + LITELLM_TIMEOUTS
+
+# Unreachable backend: fail over and take it out of rotation for a cooldown
+CONNECTION_EXCEPTIONS = (
+    ConnectionError, EndpointConnectionError, ConnectionClosedError
+) + LITELLM_CONNECTION_ERRORS
+
+THROTTLING_ERROR_CODES = {
+    'ThrottlingException', 'TooManyRequestsException', 'ServiceUnavailableException',
+    'ModelNotReadyException', 'RequestLimitExceeded',
+}
+
+
+def _is_throttling(error: Exception) -> bool:
+    return isinstance(error, ClientError) and error.response.get('Error', {}).get('Code') in THROTTLING_ERROR_CODES
+
+
+def parse_model_spec(spec: str) -> Tuple[str, str]:
+    """Split a model spec such as 'ollama/llama3.1:8b' into (kind, model)."""
+    if spec == 'mock':
+        return 'mock', 'mock'
+    if spec == 'llama-cpp':
+        return 'llama-cpp', os.environ.get('LLAMA_CPP_MODEL_PATH', '')
+    if spec.startswith('ollama/'):
+        return 'ollama', spec.replace('ollama/', '', 1)
+    if spec.startswith('bedrock/'):
+        return 'bedrock', spec.replace('bedrock/', '', 1)
+    # Bare model names go to Ollama when a host is configured, Bedrock otherwise
+    if 'OLLAMA_HOST' in os.environ:
+        return 'ollama', spec
+    return 'bedrock', spec
+
+
+def _as_prompt(messages) -> str:
+    if isinstance(messages, str):
+        return messages
+    return "\n\n".join(f"{m['role']}: {m['content']}" for m in messages)
+
+
+def _truncate_at_stop(text: Any, stop: List[str]) -> Any:
+    """Cut a completion at the first stop word, for backends that overrun it."""
+    if not isinstance(text, str) or not stop:
+        return text
+    cut = min((index for index in (text.find(word) for word in stop) if index >= 0), default=-1)
+    return text if cut < 0 else text[:cut]
+
+
+class LatencyTracker:
+    """
+    Call latencies over a sliding time window with nearest-rank percentiles.
+    Old samples expire so a backend that was slow gets retried later.
+    """
+
+    def __init__(self, window_seconds: float = 300, max_samples: int = 100) -> None:
+        self.window_seconds = window_seconds
+        self._samples = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append((time.monotonic(), seconds))
+
+    def _recent(self) -> List[float]:
+        cutoff = time.monotonic() - self.window_seconds
+        with self._lock:
+            while self._samples and self._samples[0][0] < cutoff:
+                self._samples.popleft()
+            return sorted(value for _, value in self._samples)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        samples = self._recent()
+        if not samples:
+            return None
+        index = max(0, min(len(samples) - 1, int(round(pct / 100.0 * len(samples))) - 1))
+        return samples[index]
+
+    def __len__(self) -> int:
+        return len(self._recent())
+
+
+class LLMBackend:
+    """A single model endpoint the router can send agent traffic to."""
+
+    def __init__(self, spec: str, timeout: float, probe_timeout: float, window_seconds: float,
+                 max_in_flight: int = 2) -> None:
+        self.spec = spec
+        self.kind, self.model = parse_model_spec(spec)
+        self.timeout = timeout
+        self.probe_timeout = probe_timeout
+        self.region = os.environ.get('AWS_REGION_NAME', 'us-east-1')
+        self.ollama_host = os.environ.get('OLLAMA_HOST', 'http://localhost:11434')
+        self.latency = LatencyTracker(window_seconds)
+        self.healthy = False
+        self.last_error: Optional[str] = None
+        # Unreachable backends sit out until this time.monotonic() value
+        self.retry_after = 0.0
+        # Calls still running here, including ones abandoned at their deadline
+        self.slots = threading.BoundedSemaphore(max_in_flight)
+        self._llms: Dict[Tuple[str, ...], Any] = {}
+        self._llms_lock = threading.Lock()
+
+    def health_check(self) -> bool:
+        """
+        Check the backend is reachable without spending tokens. Probe times are
+        not recorded: a file check and an API round trip aren't comparable, so
+        only real calls feed the latency ranking.
+        """
+        try:
+            self._probe()
+        except Exception as e:
+            self.healthy = False
+            self.last_error = str(e)
+            logger.warning(f"LLM backend {self.spec} failed health check: {e}")
+            return False
+        self.healthy = True
+        return True
+
+    def _probe(self) -> None:
+        if self.kind == 'mock':
+            return
+        if self.kind == 'llama-cpp':
+            if not LLAMA_CPP_AVAILABLE:
+                raise RuntimeError("llama-cpp-python is not installed")
+            if not self.model or not os.path.exists(self.model):
+                raise RuntimeError("LLAMA_CPP_MODEL_PATH is not set or the file does not exist")
+            return
+        if self.kind == 'ollama':
+            with urllib.request.urlopen(f"{self.ollama_host}/api/tags", timeout=self.probe_timeout):
+                return
+        if self.kind == 'bedrock':
+            client = boto3.client(
+                'bedrock',
+                region_name=self.region,
+                config=Config(
+                    connect_timeout=self.probe_timeout,
+                    read_timeout=self.probe_timeout,
+                    retries={'max_attempts': 1}
+                )
+            )
+            client.get_foundation_model(modelIdentifier=self.model)
+            return
+        raise RuntimeError(f"Unknown LLM backend kind: {self.kind}")
+
+    def available(self) -> bool:
+        return self.healthy and time.monotonic() >= self.retry_after
+
+    def llm(self, stop: Tuple[str, ...] = ()):
+        """
+        Build (once per stop list) the client for this backend. CrewAI LLMs take
+        their stop words at construction, and agents use a fixed set, so one
+        client per distinct list is enough.
+        """
+        key = () if self.kind == 'llama-cpp' else stop
+        with self._llms_lock:
+            if key not in self._llms:
+                self._llms[key] = self._build(list(stop))
+            return self._llms[key]
+
+    def _build(self, stop: List[str]):
+        if self.kind == 'mock':
+            return None
+        if self.kind == 'llama-cpp':
+            return LlamaCpp(
+                model_path=self.model,
+                temperature=0.7,
+                max_tokens=2000,
+                n_ctx=4096,
+                verbose=False
+            )
+        if self.kind == 'ollama':
+            return LLM(
+                model=f"ollama/{self.model}",
+                base_url=self.ollama_host,
+                temperature=0.7,
+                timeout=self.timeout,
+                stop=stop
+            )
+        # Bedrock uses boto3's default credential provider chain (IAM role in Lambda)
+        return LLM(
+            model=f"bedrock/{self.model}",
+            temperature=0.7,
+            timeout=self.timeout,
+            stop=stop
+        )
+
+    def call(self, messages, stop: Optional[List[str]] = None, **kwargs) -> Any:
+        stop = list(stop or [])
+        if self.kind == 'mock':
+            return "Mock response: no real LLM backend is configured (MODEL=mock)."
+        if self.kind == 'llama-cpp':
+            result = self.llm().invoke(_as_prompt(messages), stop=stop or None)
+        else:
+            result = self.llm(tuple(sorted(stop))).call(messages, **kwargs)
+        return _truncate_at_stop(result, stop)
+
+    def over_budget(self, budget: float) -> bool:
+        p95 = self.latency.percentile(95)
+        return p95 is not None and p95 > budget
+
+    def stats(self) -> Dict:
+        return {
+            'healthy': self.healthy,
+            'available': self.available(),
+            'samples': len(self.latency),
+            'p50': self.latency.percentile(50),
+            'p95': self.latency.percentile(95),
+            'last_error': self.last_error
+        }
+
+
+class RoutedLLM(BaseLLM):
+    """
+    CrewAI LLM that delegates every call to ``LLMRouter.invoke``, so the backend
+    order is re-evaluated per call from live latencies.
+    """
+
+    _router: Any = PrivateAttr(default=None)
+    _agent_name: str = PrivateAttr(default='')
+
+    def __init__(self, router: 'LLMRouter', agent_name: str) -> None:
+        super().__init__(model=router.assignments[agent_name], temperature=0.7)
+        self._router = router
+        self._agent_name = agent_name
+
+    def _stop_words(self) -> List[str]:
+        # Recent CrewAI releases scope the executor's stop words to this instance
+        # via call_stop_override (read through stop_sequences); 1.0 sets ``stop``
+        stop = getattr(self, 'stop_sequences', None)
+        if stop is None:
+            stop = getattr(self, 'stop', None)
+        return list(stop or [])
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs) -> Any:
+        return self._router.invoke(
+            self._agent_name,
+            messages,
+            stop=self._stop_words(),
+            tools=tools,
+            callbacks=callbacks,
+            available_functions=available_functions,
+            **kwargs
+        )
+
+    def supports_function_calling(self) -> bool:
+        # Backends differ (llama-cpp has no native tool calls); use the text protocol
+        return False
+
+
+class LLMRouter:
+    """
+    Assigns an LLM backend to each agent.
+
+    Each agent uses ``MODEL_<AGENT_NAME>`` (e.g. ``MODEL_REPORT_WRITER``) if set,
+    otherwise ``MODEL``. Extra backends listed in ``LLM_FALLBACK_MODELS`` are only
+    used for failover. All backends are health-checked at startup. On every call
+    the healthy backends are re-ranked: backends whose recent p95 exceeds
+    ``LLM_LATENCY_BUDGET_SECONDS`` go last, the agent's preferred backend goes
+    first among the rest, and the others follow by recent p50 (unmeasured ones
+    last, in configuration order).
+
+    A call that exceeds ``LLM_TIMEOUT_SECONDS`` or is throttled fails over to the
+    next backend; one that can't connect also takes the backend out of rotation
+    for ``LLM_UNHEALTHY_COOLDOWN_SECONDS``. Each backend runs at most
+    ``LLM_MAX_IN_FLIGHT_PER_BACKEND`` calls, counting abandoned ones still
+    running, and is skipped while full so hung calls can't starve the others.
+    """
+
+    def __init__(self, agent_names: List[str]) -> None:
+        timeout = float(os.environ.get('LLM_TIMEOUT_SECONDS', '120'))
+        probe_timeout = float(os.environ.get('LLM_HEALTH_CHECK_TIMEOUT_SECONDS', '10'))
+        window_seconds = float(os.environ.get('LLM_LATENCY_WINDOW_SECONDS', '300'))
+        self.latency_budget = float(os.environ.get('LLM_LATENCY_BUDGET_SECONDS', '60'))
+        self.cooldown = float(os.environ.get('LLM_UNHEALTHY_COOLDOWN_SECONDS', '60'))
+        max_in_flight = int(os.environ.get('LLM_MAX_IN_FLIGHT_PER_BACKEND', '2'))
+        default_spec = os.environ.get('MODEL', 'llama-cpp')
+
+        self.assignments = {
+            name: os.environ.get(f'MODEL_{name.upper()}', default_spec)
+            for name in agent_names
+        }
+        fallback_specs = [
+            spec.strip()
+            for spec in os.environ.get('LLM_FALLBACK_MODELS', '').split(',')
+            if spec.strip()
+        ]
+        specs = dict.fromkeys(list(self.assignments.values()) + fallback_specs)
+        self.backends = {
+            spec: LLMBackend(spec, timeout, probe_timeout, window_seconds, max_in_flight) for spec in specs
+        }
+        # Calls run on worker threads so a hung backend can be abandoned at its deadline.
+        # One worker per backend slot: a call that holds a slot always has a thread,
+        # so no call waits in the queue against its own timeout.
+        self._executor = ThreadPoolExecutor(max_workers=len(self.backends) * max_in_flight)
+        self.health_check()
+
+    def health_check(self) -> None:
+        """Probe every backend concurrently; fail loudly if none is usable."""
+        with ThreadPoolExecutor(max_workers=len(self.backends)) as executor:
+            list(executor.map(lambda backend: backend.health_check(), self.backends.values()))
+
+        for spec, backend in self.backends.items():
+            logger.info(f"LLM backend {spec}: {backend.stats()}")
+
+        if not any(backend.healthy for backend in self.backends.values()):
+            errors = '; '.join(f"{spec}: {b.last_error}" for spec, b in self.backends.items())
+            raise RuntimeError(f"No healthy LLM backend available ({errors})")
+
+    def route(self, agent_name: str) -> List[LLMBackend]:
+        """Healthy backends in the order to try them for this agent, right now."""
+        preferred = self.backends[self.assignments[agent_name]]
+        order = list(self.backends.values())
+
+        def rank(backend: LLMBackend):
+            p50 = backend.latency.percentile(50)
+            return (
+                backend.over_budget(self.latency_budget),
+                backend is not preferred,
+                p50 is None,
+                p50 or 0.0,
+                order.index(backend)
+            )
+
+        candidates = [b for b in order if b.available()]
+        if not candidates:
+            # Everything is cooling down after connection errors; try anyway rather than fail
+            candidates = [b for b in order if b.healthy]
+        return sorted(candidates, key=rank)
+
+    def invoke(self, agent_name: str, messages, **kwargs) -> Any:
+        """Call the best backend for the agent, failing over on timeouts and outages."""
+        errors = []
+        for backend in self.route(agent_name):
+            if not backend.slots.acquire(blocking=False):
+                errors.append(f"{backend.spec}: busy")
+                logger.warning(f"LLM backend {backend.spec} has no free slot for {agent_name}; failing over")
+                continue
+            start = time.monotonic()
+            # Copy the context so CrewAI's per-call contextvars (stop words, call id) reach the worker
+            context = contextvars.copy_context()
+            future = self._executor.submit(context.run, backend.call, messages, **kwargs)
+            # Release only when the call really ends, even if it was abandoned
+            future.add_done_callback(lambda _, slots=backend.slots: slots.release())
+            try:
+                result = future.result(timeout=backend.timeout)
+            except Exception as e:
+                if isinstance(e, CONNECTION_EXCEPTIONS):
+                    backend.retry_after = time.monotonic() + self.cooldown
+                    reason = 'unreachable'
+                elif isinstance(e, TIMEOUT_EXCEPTIONS) or _is_throttling(e):
+                    # A timed-out call counts against the backend's latency profile
+                    backend.latency.record(time.monotonic() - start)
+                    reason = 'timed out or throttled'
+                else:
+                    raise
+                backend.last_error = f"{reason}: {e}"
+                errors.append(f"{backend.spec}: {reason}")
+                logger.warning(f"LLM backend {backend.spec} {reason} for {agent_name}; failing over")
+                continue
+            backend.latency.record(time.monotonic() - start)
+            return result
+        raise TimeoutError(f"No LLM backend answered for {agent_name} ({'; '.join(errors)})")
+
+    def llm_for(self, agent_name: str) -> RoutedLLM:
+        return RoutedLLM(self, agent_name)
+
+    def stats(self) -> Dict[str, Dict]:
+        return {spec: backend.stats() for spec, backend in self.backends.items()}
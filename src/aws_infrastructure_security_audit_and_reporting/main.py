@@ -1,12 +1,15 @@
 #!/usr/bin/env python
 import sys
 import os
+import json
 import logging
 
 # Add the src directory to the Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from aws_infrastructure_security_audit_and_reporting.crew import AwsInfrastructureSecurityAuditAndReportingCrew
+from aws_infrastructure_security_audit_and_reporting.change_events import process_change_events
+from aws_infrastructure_security_audit_and_reporting.export import export_audit_data
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,6 +24,7 @@ def run():
     """
     Run the crew.
     """
+    crew_instance = None
     try:
         crew_instance = AwsInfrastructureSecurityAuditAndReportingCrew()
         result = crew_instance.crew().kickoff()
@@ -44,6 +48,17 @@ def run():
             f.write("3. Run the crew again with proper configuration\n")
         logger.info("Mock report generated and saved to report.md")
 
+    # Structured inventory and findings for trend analysis, next to report.md,
+    # exported from what the crew's scanner already collected
+    scanner = crew_instance.scanner if crew_instance else None
+    try:
+        export_audit_data(os.environ.get('AUDIT_DATA_DIR', 'audit-data'), scanner=scanner)
+    except Exception as e:
+        logger.error(f"Error exporting audit data: {e}")
+    finally:
+        if scanner:
+            scanner.inventory.close()
+
 def train():
     """
     Train the crew for a given number of iterations.
@@ -80,6 +95,20 @@ def test():
     except Exception as e:
         raise Exception(f"An error occurred while testing the crew: {e}")
 
+def rescan():
+    """
+    Replay a file of change events and re-scan only the affected resources.
+    """
+    with open(sys.argv[2]) as f:
+        events = json.load(f)
+    if isinstance(events, list):
+        events = {'events': events}
+    try:
+        print(json.dumps(process_change_events(events), indent=2))
+
+    except Exception as e:
+        raise Exception(f"An error occurred while re-scanning changed resources: {e}")
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("Usage: main.py <command> [<args>]")
@@ -94,6 +123,8 @@ if __name__ == "__main__":
         replay()
     elif command == "test":
         test()
+    elif command == "rescan":
+        rescan()
     else:
         print(f"Unknown command: {command}")
         sys.exit(1)
@@ -0,0 +1,191 @@
+import os
+import json
+import time
+import fcntl
+import hashlib
+import logging
+import tempfile
+from typing import Dict, NamedTuple, Optional
+
+import boto3
+
+logger = logging.getLogger(__name__)
+
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+
+def run_scope(inputs: Dict, region: str, kind: str = 'full-audit') -> str:
+    """Key identifying audits that would do the same work."""
+    digest = hashlib.sha256(json.dumps(inputs, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+    return f"{kind}#{region}#{digest}"
+
+
+class DynamoDBRunStore:
+    """Run records in a DynamoDB table keyed by ``scope``, with TTL on ``expires_at``."""
+
+    def __init__(self, table_name: str) -> None:
+        self.table = boto3.resource('dynamodb').Table(table_name)
+
+    def get(self, scope: str) -> Optional[Dict]:
+        item = self.table.get_item(Key={'scope': scope}, ConsistentRead=True).get('Item')
+        if item is None:
+            return None
+        # DynamoDB numbers come back as Decimal
+        return {key: int(value) if key in ('version', 'lease_expires_at', 'completed_at', 'started_at', 'expires_at')
+                else value for key, value in item.items()}
+
+    def compare_and_put(self, record: Dict, expected_version: Optional[int]) -> bool:
+        if expected_version is None:
+            condition = {'ConditionExpression': 'attribute_not_exists(#scope)',
+                         'ExpressionAttributeNames': {'#scope': 'scope'}}
+        else:
+            condition = {'ConditionExpression': '#version = :version',
+                         'ExpressionAttributeNames': {'#version': 'version'},
+                         'ExpressionAttributeValues': {':version': expected_version}}
+        try:
+            self.table.put_item(Item=record, **condition)
+            return True
+        except self.table.meta.client.exceptions.ConditionalCheckFailedException:
+            return False
+
+
+class LocalRunStore:
+    """
+    File-backed stand-in for DynamoDBRunStore for local runs: one JSON file per
+    scope, with compare-and-put serialised by an exclusive flock.
+    """
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        self.directory = directory or os.path.join(tempfile.gettempdir(), 'audit-runs')
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock_path = os.path.join(self.directory, '.lock')
+
+    def _path(self, scope: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(scope.encode('utf-8')).hexdigest() + '.json')
+
+    def get(self, scope: str) -> Optional[Dict]:
+        try:
+            with open(self._path(scope)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def compare_and_put(self, record: Dict, expected_version: Optional[int]) -> bool:
+        with open(self._lock_path, 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            current = self.get(record['scope'])
+            if (current['version'] if current else None) != expected_version:
+                return False
+            tmp_path = self._path(record['scope']) + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(record, f)
+            os.replace(tmp_path, self._path(record['scope']))
+            return True
+
+
+class RunClaim(NamedTuple):
+    """Outcome of ``RunCoordinator.begin``: 'acquired', 'fresh' or 'in_flight'."""
+    state: str
+    record: Dict
+
+
+class RunCoordinator:
+    """
+    Lease-based guard so overlapping audits for the same scope (a scheduled run
+    racing a manual invocation, or a Lambda retry) don't duplicate the work.
+
+    Uses DynamoDB when ``RUN_COORDINATOR_TABLE`` is set, otherwise a local file
+    store. A completed result younger than ``RUN_RESULT_FRESHNESS_SECONDS`` is
+    reused; a running lease younger than ``RUN_LEASE_SECONDS`` is joined for at
+    most ``RUN_JOIN_WAIT_SECONDS`` (default 0: report it as in flight at once,
+    rather than hold a concurrency slot polling).
+    """
+
+    def __init__(self, store=None) -> None:
+        table_name = os.environ.get('RUN_COORDINATOR_TABLE')
+        self.store = store or (DynamoDBRunStore(table_name) if table_name else LocalRunStore())
+        # Longer than the 15 minute Lambda timeout so a live run never loses its lease
+        self.lease_seconds = int(os.environ.get('RUN_LEASE_SECONDS', '960'))
+        self.freshness_seconds = int(os.environ.get('RUN_RESULT_FRESHNESS_SECONDS', '3600'))
+        self.poll_seconds = float(os.environ.get('RUN_POLL_SECONDS', '10'))
+        self.join_wait_seconds = float(os.environ.get('RUN_JOIN_WAIT_SECONDS', '0'))
+
+    def begin(self, scope: str, owner: str, force: bool = False) -> RunClaim:
+        """Reuse a fresh result, report an in-flight run, or take the lease."""
+        while True:
+            now = int(time.time())
+            current = self.store.get(scope)
+            if current:
+                if (not force and current['status'] == COMPLETED
+                        and now - current.get('completed_at', 0) <= self.freshness_seconds):
+                    return RunClaim('fresh', current)
+                # A retry of the same invocation (same owner) takes its own lease back
+                if (current['status'] == RUNNING and current['owner'] != owner
+                        and current['lease_expires_at'] > now):
+                    return RunClaim('in_flight', current)
+
+            record = {
+                'scope': scope,
+                'status': RUNNING,
+                'owner': owner,
+                'version': current['version'] + 1 if current else 1,
+                'started_at': now,
+                'lease_expires_at': now + self.lease_seconds,
+                'expires_at': now + self.lease_seconds + self.freshness_seconds,
+            }
+            if self.store.compare_and_put(record, current['version'] if current else None):
+                return RunClaim('acquired', record)
+            # Lost a race with another invocation; re-read and decide again
+
+    def wait(self, scope: str, timeout: float) -> Optional[Dict]:
+        """Poll until the in-flight run finishes; returns its record or None on timeout."""
+        deadline = time.monotonic() + max(0.0, timeout)
+        while True:
+            current = self.store.get(scope)
+            if current is None or current['status'] != RUNNING:
+                return current
+            if current['lease_expires_at'] <= time.time() or time.monotonic() >= deadline:
+                return None
+            time.sleep(min(self.poll_seconds, max(0.0, deadline - time.monotonic())))
+
+    def join(self, scope: str, owner: str, force: bool = False, timeout: Optional[float] = None) -> RunClaim:
+        """
+        Wait (up to ``RUN_JOIN_WAIT_SECONDS``, capped by ``timeout``) for an
+        in-flight run, then decide again: reuse its result if it completed,
+        take the lease if it expired or the run failed, or report it as still
+        in flight.
+        """
+        wait_seconds = self.join_wait_seconds if timeout is None else min(timeout, self.join_wait_seconds)
+        if wait_seconds > 0:
+            self.wait(scope, wait_seconds)
+        return self.begin(scope, owner, force=force)
+
+    def complete(self, scope: str, owner: str, result: Dict) -> None:
+        self._finish(scope, owner, COMPLETED, {'result': json.dumps(result)})
+
+    def abandon(self, scope: str, owner: str) -> None:
+        """Release the lease after a failure so the next invocation runs immediately."""
+        self._finish(scope, owner, FAILED, {})
+
+    def _finish(self, scope: str, owner: str, status: str, extra: Dict) -> None:
+        current = self.store.get(scope)
+        if current is None or current['owner'] != owner:
+            logger.warning(f"Run lease for {scope} is no longer held by {owner}; not recording {status}")
+            return
+        now = int(time.time())
+        record = dict(
+            current,
+            status=status,
+            version=current['version'] + 1,
+            completed_at=now,
+            expires_at=now + self.freshness_seconds,
+            **extra
+        )
+        if not self.store.compare_and_put(record, current['version']):
+            logger.warning(f"Run record for {scope} changed concurrently; not recording {status}")
+
+    @staticmethod
+    def result_of(record: Dict) -> Dict:
+        return json.loads(record.get('result') or '{}')
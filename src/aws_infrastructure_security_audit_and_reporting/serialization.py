@@ -0,0 +1,122 @@
+import os
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional, Type
+
+# Optional fast JSON backends
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class DateTimeEncoder(json.JSONEncoder):
+    """Custom JSON encoder for datetime objects."""
+    def default(self, obj):
+        if isinstance(obj, datetime):
+            return obj.isoformat()
+        return super().default(obj)
+
+
+class JSONSerializer:
+    """Standard library backend; compact output, datetimes as ISO 8601."""
+
+    name = 'stdlib'
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        return json.dumps(obj, cls=DateTimeEncoder, separators=(',', ':')).encode('utf-8')
+
+    def dumps(self, obj: Any) -> str:
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, data) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer(JSONSerializer):
+    """orjson backend; serializes datetimes natively in C."""
+
+    name = 'orjson'
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def loads(self, data) -> Any:
+        return orjson.loads(data)
+
+
+class MsgspecSerializer(JSONSerializer):
+    """
+    msgspec backend; serializes datetimes natively in C. UTC is written as
+    ``Z`` rather than ``+00:00``, so it is only used when chosen explicitly.
+    """
+
+    name = 'msgspec'
+
+    def __init__(self) -> None:
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def loads(self, data) -> Any:
+        return self._decoder.decode(data)
+
+
+SERIALIZERS: Dict[str, Type[JSONSerializer]] = {
+    'stdlib': JSONSerializer,
+    'orjson': OrjsonSerializer,
+    'msgspec': MsgspecSerializer,
+}
+
+AVAILABLE = {
+    'stdlib': True,
+    'orjson': ORJSON_AVAILABLE,
+    'msgspec': MSGSPEC_AVAILABLE,
+}
+
+
+def get_serializer(name: Optional[str] = None) -> JSONSerializer:
+    """
+    Return a serializer by name ('orjson', 'msgspec' or 'stdlib'). With no name,
+    ``JSON_BACKEND`` is used; 'auto' (the default) picks orjson if installed, as
+    its output matches the standard library's.
+    An unknown or uninstalled backend logs a warning and falls back to the
+    standard library, since this runs at import time.
+    """
+    name = (name or os.environ.get('JSON_BACKEND') or 'auto').strip().lower()
+    if name == 'auto':
+        name = 'orjson' if AVAILABLE['orjson'] else 'stdlib'
+    if name not in SERIALIZERS:
+        logger.warning(f"Unknown JSON backend {name!r}; falling back to stdlib json")
+        return JSONSerializer()
+    if not AVAILABLE[name]:
+        logger.warning(f"JSON backend {name} is not installed; falling back to stdlib json")
+        return JSONSerializer()
+    return SERIALIZERS[name]()
+
+
+serializer = get_serializer()
+
+
+def dumps(obj: Any) -> str:
+    return serializer.dumps(obj)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    return serializer.dumps_bytes(obj)
+
+
+def loads(data) -> Any:
+    return serializer.loads(data)
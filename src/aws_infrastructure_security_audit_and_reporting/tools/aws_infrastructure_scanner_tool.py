@@ -1,105 +1,110 @@
-from typing import Type, Dict, List
-from crewai_tools import BaseTool
+from typing import Any, ClassVar, Iterator, Optional, Tuple, Type, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 import boto3
-import json
-from datetime import datetime
 import os
+import time
+import logging
+from aws_infrastructure_security_audit_and_reporting.inventory_store import ScanInventory, ServiceInventory
+from aws_infrastructure_security_audit_and_reporting.serialization import dumps
+from aws_infrastructure_security_audit_and_reporting.tools.collectors import COLLECTORS, plan_scan, scope_region
+
+logger = logging.getLogger(__name__)
 
 class AWSInfrastructureScannerInput(BaseModel):
     """Input schema for AWSInfrastructureScanner."""
     service: str = Field(
         ...,
-        description="AWS service to scan (e.g., 'ec2', 's3', 'iam', 'rds', 'vpc', 'all')"
+        description=f"AWS service to scan (one of {', '.join(repr(s) for s in COLLECTORS)}, or 'all')"
     )
     region: str = Field(
         default_factory=lambda: os.getenv('AWS_REGION_NAME', 'us-west-2'),
         description="AWS region to scan"
     )
 
-class DateTimeEncoder(json.JSONEncoder):
-    """Custom JSON encoder for datetime objects."""
-    def default(self, obj):
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super().default(obj)
-
 class AWSInfrastructureScannerTool(BaseTool):
     name: str = "AWS Infrastructure Scanner"
     description: str = (
         "A tool for scanning and mapping AWS infrastructure components and their configurations. "
         "Can retrieve detailed information about EC2 instances, S3 buckets, IAM configurations, "
-        "RDS instances, VPC settings, and security groups. Use this tool to gather information "
+        "RDS instances, VPC settings, security groups, load balancers, Lambda functions, API Gateways, "
+        "KMS keys, CloudTrail trails and EBS snapshots. Use this tool to gather information "
         "about specific AWS services or get a complete infrastructure overview."
     )
     args_schema: Type[BaseModel] = AWSInfrastructureScannerInput
 
+    SERVICES: ClassVar[List[str]] = list(COLLECTORS)
+    # Resources per type returned to the agent. Scans still page through the
+    # full inventory into ``inventory`` (on disk), which the export reads back.
+    SAMPLE_SIZE: ClassVar[int] = 5
+
+    inventory: Any = Field(
+        default_factory=lambda: ScanInventory(AWSInfrastructureScannerTool.SAMPLE_SIZE),
+        exclude=True,
+        description="Full inventories spilled during this run"
+    )
+
     def _run(self, service: str, region: str) -> str:
         try:
             if service.lower() == 'all':
-                return json.dumps(self._scan_all_services(region), indent=2, cls=DateTimeEncoder)
-            return json.dumps(self._scan_service(service.lower(), region), indent=2, cls=DateTimeEncoder)
+                return dumps(self._scan_all_services(region))
+            return dumps(self._scan_service(service.lower(), region))
         except Exception as e:
             return f"Error scanning AWS infrastructure: {str(e)}"
 
     def _scan_all_services(self, region: str) -> Dict:
-        return {
-            'ec2': self._scan_service('ec2', region),
-            's3': self._scan_service('s3', region),
-            'iam': self._scan_service('iam', region),
-            'rds': self._scan_service('rds', region),
-            'vpc': self._scan_service('vpc', region)
-        }
+        return {entry.service: entry.summary() for entry in self.collect_all([region])}
 
-    def _scan_service(self, service: str, region: str) -> Dict:
-        session = boto3.Session(region_name=region)
-
-        if service == 'ec2':
-            client = session.client('ec2')
-            instances = client.describe_instances()
-            security_groups = client.describe_security_groups()
-            return {
-                'instances': instances['Reservations'][:5],
-                'security_groups': security_groups['SecurityGroups'][:5]
-            }
+    def collect_all(self, regions: List[str], deadline: Optional[float] = None) -> List[ServiceInventory]:
+        """
+        Spill every service in ``regions`` concurrently, skipping any already
+        collected this run. Tasks not started by ``deadline`` (a
+        ``time.monotonic()`` value) are skipped so callers stay in their budget.
+        """
+        def collect(task):
+            service, region = task
+            if deadline is not None and time.monotonic() >= deadline:
+                logger.warning(f"Time budget exhausted; skipping {service} in {region}")
+                return None
+            return self._collect(service, region)
 
-        elif service == 's3':
-            client = session.client('s3')
-            buckets = client.list_buckets()
-            bucket_details = []
-            for bucket in buckets['Buckets'][:5]:
-                try:
-                    encryption = client.get_bucket_encryption(Bucket=bucket['Name'])
-                except client.exceptions.ClientError:
-                    encryption = None
-                bucket_details.append({
-                    'name': bucket['Name'],
-                    'creation_date': bucket['CreationDate'],
-                    'encryption': encryption
-                })
-            return {'buckets': bucket_details}
+        tasks = plan_scan(self.SERVICES, regions)
+        max_workers = int(os.getenv('SCANNER_MAX_WORKERS', '8'))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return [entry for entry in executor.map(collect, tasks) if entry is not None]
 
-        elif service == 'iam':
-            client = session.client('iam')
-            return {
-                'users': client.list_users()['Users'][:5],
-                'roles': client.list_roles()['Roles'][:5],
-                'policies': client.list_policies(Scope='Local')['Policies'][:5]
-            }
+    def _scan_service(self, service: str, region: str) -> Dict:
+        if service not in COLLECTORS:
+            return {'error': f'Unsupported service: {service}'}
+        return self._collect(service, region).summary()
 
-        elif service == 'rds':
-            client = session.client('rds')
-            return {
-                'instances': client.describe_db_instances()['DBInstances'][:5]
-            }
+    def _collect(self, service: str, region: str) -> ServiceInventory:
+        """
+        Spill the service's full inventory once per run; later calls reuse it.
+        Global services are keyed (and exported) under region ``'global'``, so
+        asking for them from several regions still lists them once.
+        """
+        return self.inventory.collect(
+            service, scope_region(service, region), lambda: self._iter_service_pages(service, region)
+        )
 
-        elif service == 'vpc':
-            client = session.client('ec2')
-            return {
-                'vpcs': client.describe_vpcs()['Vpcs'][:5],
-                'subnets': client.describe_subnets()['Subnets'][:5],
-                'network_acls': client.describe_network_acls()['NetworkAcls'][:5]
-            }
+    def _iter_service_pages(self, service: str, region: str) -> Iterator[Tuple[str, List[Dict]]]:
+        """
+        Yield (resource_type, page) pairs covering a service's full, untruncated
+        inventory one API page at a time, for spilling to an InventoryStore.
+        """
+        collector = COLLECTORS.get(service)
+        if collector is None:
+            raise ValueError(f'Unsupported service: {service}')
+        yield from collector.iter_pages(boto3.Session(region_name=region))
 
-        else:
+    def _scan_resources(self, service: str, resource_type: str, resource_ids: List[str], region: str) -> Dict:
+        """
+        Re-scan specific resources, returning the same shape as ``_scan_service``.
+        Resources that no longer exist are skipped.
+        """
+        collector = COLLECTORS.get(service)
+        if collector is None:
             return {'error': f'Unsupported service: {service}'}
+        return collector.lookup(boto3.Session(region_name=region), resource_type, resource_ids)
@@ -0,0 +1,292 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+GLOBAL = 'global'
+REGIONAL = 'regional'
+
+
+# Error codes meaning the resource is gone, as opposed to throttling or missing permissions
+NOT_FOUND_CODES = {'404', 'NoSuchBucket', 'NoSuchEntity', 'NotFound', 'NotFoundException'}
+
+
+def _error_code(error: Exception) -> str:
+    return getattr(error, 'response', {}).get('Error', {}).get('Code', '')
+
+
+def is_not_found(error: Exception) -> bool:
+    """True for ClientErrors saying the resource doesn't exist (each service spells it differently)."""
+    code = _error_code(error)
+    return code in NOT_FOUND_CODES or code.endswith(('NotFound', 'NotFoundException', 'NotFoundFault'))
+
+
+def project(item: Dict, fields: Optional[Tuple[str, ...]]) -> Dict:
+    """Keep only the listed top-level keys (all keys when ``fields`` is None)."""
+    if fields is None:
+        return item
+    return {key: item[key] for key in fields if key in item}
+
+
+@dataclass(frozen=True)
+class ResourceCall:
+    """
+    One resource type within a service: the API call that lists it, how to
+    page through it, which fields to keep, and how to look up a single resource.
+    """
+    resource_type: str
+    operation: str
+    result_key: str
+    id_keys: Tuple[str, ...]
+    paginated: bool = True
+    params: Dict[str, Any] = field(default_factory=dict)
+    fields: Optional[Tuple[str, ...]] = None
+    # (client, item) -> item, for per-resource follow-up calls
+    transform: Optional[Callable] = None
+    # (client, resource_id) -> [raw items], for targeted re-scans
+    lookup: Optional[Callable] = None
+
+    def pages(self, client) -> Iterator[List[Dict]]:
+        if self.paginated:
+            for page in client.get_paginator(self.operation).paginate(**self.params):
+                yield page[self.result_key]
+        else:
+            yield getattr(client, self.operation)(**self.params)[self.result_key]
+
+    def prepare(self, client, item: Dict) -> Dict:
+        if self.transform:
+            item = self.transform(client, item)
+        return project(item, self.fields)
+
+    def prepare_all(self, client, items: List[Dict]) -> List[Dict]:
+        """Prepare each item, skipping (and logging) ones whose follow-up calls fail."""
+        prepared = []
+        for item in items:
+            try:
+                prepared.append(self.prepare(client, item))
+            except Exception as e:
+                # One unreadable resource shouldn't drop the rest of the service
+                logger.warning(f"Skipping {self.resource_type} item {project(item, self.id_keys)}: {e}")
+        return prepared
+
+
+@dataclass(frozen=True)
+class ServiceCollector:
+    """
+    A scannable service. ``scope`` tells the scheduler whether the service is
+    global (scanned once per account) or regional (scanned once per region).
+    """
+    name: str
+    client: str
+    calls: Tuple[ResourceCall, ...]
+    scope: str = REGIONAL
+
+    def call_for(self, resource_type: str) -> Optional[ResourceCall]:
+        return next((call for call in self.calls if call.resource_type == resource_type), None)
+
+    def iter_pages(self, session) -> Iterator[Tuple[str, List[Dict]]]:
+        """Yield (resource_type, prepared page) across the full inventory."""
+        client = session.client(self.client)
+        for call in self.calls:
+            for page in call.pages(client):
+                yield call.resource_type, call.prepare_all(client, page)
+
+    def lookup(self, session, resource_type: str, resource_ids: List[str]) -> Dict[str, List[Dict]]:
+        """
+        Re-fetch specific resources; ones that no longer exist are skipped. Any
+        other error (throttling, access denied) propagates so the caller can retry.
+        """
+        call = self.call_for(resource_type)
+        if call is None or call.lookup is None:
+            raise ValueError(f'Unsupported resource type: {self.name}/{resource_type}')
+        client = session.client(self.client)
+        resources = []
+        for resource_id in resource_ids:
+            try:
+                resources.extend(call.prepare(client, item) for item in call.lookup(client, resource_id))
+            except client.exceptions.ClientError as e:
+                if not is_not_found(e):
+                    raise
+                # Deleted since the change was observed
+        return {resource_type: resources}
+
+
+COLLECTORS: Dict[str, ServiceCollector] = {}
+
+
+def register(collector: ServiceCollector) -> ServiceCollector:
+    COLLECTORS[collector.name] = collector
+    return collector
+
+
+def scope_region(service: str, region: str) -> str:
+    """Region label for a service's results: ``'global'`` for global services."""
+    return GLOBAL if COLLECTORS[service].scope == GLOBAL else region
+
+
+def plan_scan(services: List[str], regions: List[str]) -> List[Tuple[str, str]]:
+    """
+    Expand services x regions into (service, region) scan tasks. Global services
+    are scheduled once, in the first region.
+    """
+    tasks = []
+    for service in services:
+        collector = COLLECTORS[service]
+        for region in (regions[:1] if collector.scope == GLOBAL else regions):
+            tasks.append((service, region))
+    return tasks
+
+
+def _optional(call, missing_code: str, default=None):
+    """Run a Get* call, mapping 'not configured' to ``default``; other errors raise."""
+    try:
+        return call()
+    except Exception as e:
+        if _error_code(e) == missing_code:
+            return default
+        raise
+
+
+PUBLIC_GRANTEES = (
+    'http://acs.amazonaws.com/groups/global/AllUsers',
+    'http://acs.amazonaws.com/groups/global/AuthenticatedUsers',
+)
+
+
+def _bucket_details(client, bucket: Dict) -> Dict:
+    name = bucket['Name']
+    encryption = _optional(lambda: client.get_bucket_encryption(Bucket=name),
+                           'ServerSideEncryptionConfigurationNotFoundError')
+    policy_status = _optional(lambda: client.get_bucket_policy_status(Bucket=name)['PolicyStatus'],
+                              'NoSuchBucketPolicy', {})
+    public_access_block = _optional(
+        lambda: client.get_public_access_block(Bucket=name)['PublicAccessBlockConfiguration'],
+        'NoSuchPublicAccessBlockConfiguration'
+    )
+    grants = client.get_bucket_acl(Bucket=name).get('Grants', [])
+    return {
+        'name': name,
+        'creation_date': bucket.get('CreationDate'),
+        'encryption': encryption,
+        'policy_is_public': bool(policy_status.get('IsPublic')),
+        'public_access_block': public_access_block,
+        'acl_is_public': any(g.get('Grantee', {}).get('URI') in PUBLIC_GRANTEES for g in grants),
+    }
+
+
+def _bucket_lookup(client, name: str) -> List[Dict]:
+    # Raises a 404 ClientError if the bucket was deleted
+    client.head_bucket(Bucket=name)
+    return [{'Name': name}]
+
+
+def _key_details(client, key: Dict) -> Dict:
+    metadata = client.describe_key(KeyId=key['KeyId'])['KeyMetadata']
+    # Rotation status is only available for customer-managed symmetric keys with
+    # KMS-generated material; imported (EXTERNAL) and custom key store keys reject it
+    if (metadata.get('KeyManager') == 'CUSTOMER' and metadata.get('KeySpec') == 'SYMMETRIC_DEFAULT'
+            and metadata.get('Origin') == 'AWS_KMS'):
+        metadata['KeyRotationEnabled'] = client.get_key_rotation_status(KeyId=key['KeyId'])['KeyRotationEnabled']
+    return metadata
+
+
+def _trail_details(client, trail: Dict) -> Dict:
+    status = client.get_trail_status(Name=trail['TrailARN'])
+    return dict(trail, IsLogging=status.get('IsLogging'))
+
+
+def _snapshot_details(client, snapshot: Dict) -> Dict:
+    permissions = client.describe_snapshot_attribute(
+        SnapshotId=snapshot['SnapshotId'], Attribute='createVolumePermission'
+    )['CreateVolumePermissions']
+    return dict(snapshot, Public=any(p.get('Group') == 'all' for p in permissions))
+
+
+register(ServiceCollector('ec2', 'ec2', (
+    ResourceCall('instances', 'describe_instances', 'Reservations', ('InstanceId',),
+                 lookup=lambda c, i: c.describe_instances(InstanceIds=[i])['Reservations']),
+    ResourceCall('security_groups', 'describe_security_groups', 'SecurityGroups', ('GroupId',),
+                 lookup=lambda c, i: c.describe_security_groups(GroupIds=[i])['SecurityGroups']),
+)))
+
+register(ServiceCollector('s3', 's3', (
+    ResourceCall('buckets', 'list_buckets', 'Buckets', ('name',), paginated=False,
+                 transform=_bucket_details,
+                 lookup=_bucket_lookup),
+), scope=GLOBAL))
+
+register(ServiceCollector('iam', 'iam', (
+    ResourceCall('users', 'list_users', 'Users', ('Arn', 'UserName'),
+                 lookup=lambda c, i: [c.get_user(UserName=i)['User']]),
+    ResourceCall('roles', 'list_roles', 'Roles', ('Arn', 'RoleName'),
+                 lookup=lambda c, i: [c.get_role(RoleName=i)['Role']]),
+    ResourceCall('policies', 'list_policies', 'Policies', ('Arn', 'PolicyName'),
+                 params={'Scope': 'Local'},
+                 lookup=lambda c, i: [c.get_policy(PolicyArn=i)['Policy']]),
+), scope=GLOBAL))
+
+register(ServiceCollector('rds', 'rds', (
+    ResourceCall('instances', 'describe_db_instances', 'DBInstances', ('DBInstanceArn', 'DBInstanceIdentifier'),
+                 lookup=lambda c, i: c.describe_db_instances(DBInstanceIdentifier=i)['DBInstances']),
+)))
+
+register(ServiceCollector('vpc', 'ec2', (
+    ResourceCall('vpcs', 'describe_vpcs', 'Vpcs', ('VpcId',),
+                 lookup=lambda c, i: c.describe_vpcs(VpcIds=[i])['Vpcs']),
+    ResourceCall('subnets', 'describe_subnets', 'Subnets', ('SubnetId',),
+                 lookup=lambda c, i: c.describe_subnets(SubnetIds=[i])['Subnets']),
+    ResourceCall('network_acls', 'describe_network_acls', 'NetworkAcls', ('NetworkAclId',),
+                 lookup=lambda c, i: c.describe_network_acls(NetworkAclIds=[i])['NetworkAcls']),
+)))
+
+register(ServiceCollector('elbv2', 'elbv2', (
+    ResourceCall('load_balancers', 'describe_load_balancers', 'LoadBalancers', ('LoadBalancerArn',),
+                 fields=('LoadBalancerArn', 'LoadBalancerName', 'DNSName', 'Scheme', 'Type', 'VpcId',
+                         'SecurityGroups', 'State', 'IpAddressType', 'CreatedTime'),
+                 lookup=lambda c, i: c.describe_load_balancers(LoadBalancerArns=[i])['LoadBalancers']),
+)))
+
+# Environment variables are projected out: they frequently hold secrets
+register(ServiceCollector('lambda', 'lambda', (
+    ResourceCall('functions', 'list_functions', 'Functions', ('FunctionArn', 'FunctionName'),
+                 fields=('FunctionName', 'FunctionArn', 'Runtime', 'Role', 'Handler', 'Timeout', 'MemorySize',
+                         'LastModified', 'VpcConfig', 'TracingConfig', 'KMSKeyArn', 'Architectures',
+                         'PackageType'),
+                 lookup=lambda c, i: [c.get_function_configuration(FunctionName=i)]),
+)))
+
+register(ServiceCollector('apigateway', 'apigateway', (
+    ResourceCall('rest_apis', 'get_rest_apis', 'items', ('id',),
+                 fields=('id', 'name', 'createdDate', 'endpointConfiguration', 'policy',
+                         'apiKeySource', 'disableExecuteApiEndpoint'),
+                 lookup=lambda c, i: [c.get_rest_api(restApiId=i)]),
+)))
+
+register(ServiceCollector('kms', 'kms', (
+    ResourceCall('keys', 'list_keys', 'Keys', ('Arn', 'KeyId'),
+                 transform=_key_details,
+                 fields=('KeyId', 'Arn', 'KeyManager', 'KeyState', 'KeySpec', 'KeyUsage', 'Origin',
+                         'Description', 'CreationDate', 'KeyRotationEnabled'),
+                 lookup=lambda c, i: [{'KeyId': i}]),
+)))
+
+# Shadow trails are excluded so a multi-region trail is listed only in its home region
+register(ServiceCollector('cloudtrail', 'cloudtrail', (
+    ResourceCall('trails', 'describe_trails', 'trailList', ('TrailARN', 'Name'), paginated=False,
+                 params={'includeShadowTrails': False},
+                 transform=_trail_details,
+                 fields=('Name', 'TrailARN', 'HomeRegion', 'IsMultiRegionTrail', 'IsOrganizationTrail',
+                         'LogFileValidationEnabled', 'KmsKeyId', 'S3BucketName',
+                         'IncludeGlobalServiceEvents', 'IsLogging'),
+                 lookup=lambda c, i: c.describe_trails(trailNameList=[i])['trailList']),
+)))
+
+register(ServiceCollector('ebs', 'ec2', (
+    ResourceCall('snapshots', 'describe_snapshots', 'Snapshots', ('SnapshotId',),
+                 params={'OwnerIds': ['self']},
+                 transform=_snapshot_details,
+                 fields=('SnapshotId', 'VolumeId', 'VolumeSize', 'Encrypted', 'KmsKeyId', 'State',
+                         'StartTime', 'OwnerId', 'Description', 'Public'),
+                 lookup=lambda c, i: c.describe_snapshots(SnapshotIds=[i])['Snapshots']),
+)))
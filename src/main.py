@@ -1,14 +1,26 @@
 #!/usr/bin/env python
 import os
 import json
+import time
 import boto3
+import uuid
 import logging
 from aws_infrastructure_security_audit_and_reporting.crew import AwsInfrastructureSecurityAuditAndReportingCrew
+from aws_infrastructure_security_audit_and_reporting.change_events import (
+    failed_message_ids,
+    is_change_event_batch,
+    process_change_events,
+)
+from aws_infrastructure_security_audit_and_reporting.export import export_audit_data
+from aws_infrastructure_security_audit_and_reporting.run_coordinator import RunCoordinator, run_scope
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Time kept back from the export for uploads and recording the run
+EXPORT_RESERVE_SECONDS = 60
+
 def lambda_handler(event, context):
     """
     AWS Lambda handler function to run the security audit crew.
@@ -20,14 +32,34 @@ def lambda_handler(event, context):
     Returns:
         dict: Response containing execution status and report location
     """
+    if is_change_event_batch(event):
+        return handle_change_events(event)
+
+    claim = None
     try:
+        # Run the crew with empty inputs (or extract from event if needed)
+        inputs = event.get('inputs', {})
+
+        # Skip duplicate work when another invocation (scheduled run, manual run
+        # or a retry) is auditing, or has just audited, the same scope
+        coordinator = RunCoordinator()
+        scope = run_scope(inputs, os.environ.get('AWS_REGION_NAME', 'us-east-1'))
+        owner = getattr(context, 'aws_request_id', None) or str(uuid.uuid4())
+        force = event.get('force', False)
+        claim = coordinator.begin(scope, owner, force=force)
+        if claim.state == 'in_flight':
+            # Take over if the other run fails or its lease lapses while we wait
+            logger.info(f"Audit for {scope} already running as {claim.record['owner']}")
+            remaining = context.get_remaining_time_in_millis() / 1000 - 30 if context else 0
+            claim = coordinator.join(scope, owner, force=force, timeout=remaining)
+        if claim.state != 'acquired':
+            return reuse_run(coordinator, scope, claim)
+
         logger.info("Starting AWS Infrastructure Security Audit")
         
         # Initialize the crew - will use IAM role credentials automatically
         crew_instance = AwsInfrastructureSecurityAuditAndReportingCrew()
         
-        # Run the crew with empty inputs (or extract from event if needed)
-        inputs = event.get('inputs', {})
         result = crew_instance.crew().kickoff(inputs=inputs)
         
         # Get the S3 bucket name from environment variables or use a default
@@ -48,20 +80,132 @@ def lambda_handler(event, context):
         )
         
         logger.info(f"Report generated and uploaded to s3://{s3_bucket}/{report_filename}")
+
+        # Export partitioned Parquet inventory/findings alongside the report,
+        # from the inventory the crew's scanner already spilled to /tmp
+        export_dir = '/tmp/audit-data'
+        data_keys = []
+        deadline = None
+        if context:
+            deadline = time.monotonic() + context.get_remaining_time_in_millis() / 1000 - EXPORT_RESERVE_SECONDS
+        try:
+            for path in export_audit_data(export_dir, scanner=crew_instance.scanner, deadline=deadline):
+                key = f"audit-data/{os.path.relpath(path, export_dir)}"
+                s3_client.upload_file(path, s3_bucket, key)
+                data_keys.append(key)
+            logger.info(f"Uploaded {len(data_keys)} audit data files to s3://{s3_bucket}/audit-data/")
+        except Exception as e:
+            logger.error(f"Error exporting audit data: {e}")
+        finally:
+            crew_instance.scanner.inventory.close()
+        
+        locations = {
+            'report_location': f"s3://{s3_bucket}/{report_filename}",
+            'data_locations': [f"s3://{s3_bucket}/{key}" for key in data_keys]
+        }
+        # The audit and uploads succeeded; failing to record that must not
+        # abandon the run or report an error, so it is handled separately
+        try:
+            coordinator.complete(scope, owner, locations)
+        except Exception as e:
+            logger.error(f"Audit for {scope} finished but could not be recorded as complete: {e}")
         
         return {
             'statusCode': 200,
-            'body': json.dumps({
-                'message': 'Security audit completed successfully',
-                'report_location': f"s3://{s3_bucket}/{report_filename}"
-            })
+            'body': json.dumps(dict(locations, message='Security audit completed successfully'))
         }
         
     except Exception as e:
         logger.error(f"Error running security audit: {str(e)}")
+        if claim is not None and claim.state == 'acquired':
+            coordinator.abandon(scope, owner)
         return {
             'statusCode': 500,
             'body': json.dumps({
                 'message': f'Error running security audit: {str(e)}'
             })
         }
+
+def reuse_run(coordinator, scope, claim):
+    """
+    Answer with the result of a fresh completed audit, or 202 while another
+    invocation still holds a live lease for the same scope.
+    """
+    record = claim.record
+    if claim.state == 'in_flight':
+        return {
+            'statusCode': 202,
+            'body': json.dumps({
+                'message': 'Security audit already in progress',
+                'run_owner': record['owner'],
+                'lease_expires_at': record['lease_expires_at']
+            })
+        }
+
+    logger.info(f"Reusing audit for {scope} completed by {record['owner']}")
+    return {
+        'statusCode': 200,
+        'body': json.dumps(dict(
+            coordinator.result_of(record),
+            message='Security audit completed successfully',
+            reused_run=record['owner']
+        ))
+    }
+
+def change_events_handler(event, context):
+    """
+    Handler for the event-mode function fed by the change events SQS queue.
+    """
+    return handle_change_events(event)
+
+def handle_change_events(event):
+    """
+    Event mode: re-scan and evaluate only the resources named in a batch of
+    CloudTrail/Config change events instead of running the full audit crew.
+
+    For SQS batches the response lists ``batchItemFailures``: only messages
+    whose resources could not be re-scanned are retried, and after the
+    queue's maxReceiveCount they move to the dead-letter queue.
+    """
+    message_ids = [record['messageId'] for record in event.get('Records', []) if record.get('messageId')]
+    try:
+        result = process_change_events(event)
+
+        s3_bucket = os.environ.get('REPORT_BUCKET_NAME', 'security-audit-reports')
+        import datetime
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d-%H-%M-%S-%f")
+        findings_key = f"event-findings/{timestamp}.json"
+
+        s3_client = boto3.client('s3')
+        s3_client.put_object(
+            Bucket=s3_bucket,
+            Key=findings_key,
+            Body=json.dumps(result),
+            ContentType='application/json'
+        )
+
+        logger.info(f"Targeted re-scan findings uploaded to s3://{s3_bucket}/{findings_key}")
+
+        failed = failed_message_ids(event, result['failed_targets'])
+        return {
+            'statusCode': 200,
+            'batchItemFailures': [{'itemIdentifier': message_id} for message_id in failed],
+            'body': json.dumps({
+                'message': 'Targeted re-scan completed successfully',
+                'resources_scanned': result['resources_scanned'],
+                'findings': len(result['findings']),
+                'failed_targets': len(result['failed_targets']),
+                'findings_location': f"s3://{s3_bucket}/{findings_key}"
+            })
+        }
+
+    except Exception as e:
+        logger.error(f"Error running targeted re-scan: {str(e)}")
+        # Report the whole batch as failed so SQS retries it (then dead-letters it)
+        return {
+            'statusCode': 500,
+            'batchItemFailures': [{'itemIdentifier': message_id} for message_id in message_ids],
+            'body': json.dumps({
+                'message': f'Error running targeted re-scan: {str(e)}'
+            })
+        }
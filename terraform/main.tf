@@ -825,6 +825,62 @@ resource "aws_iam_role_policy_attachment" "lambda_basic_execution" {
   policy_arn = "arn:aws:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole"
 }
 
+# DynamoDB table holding audit run leases and recent results, so overlapping
+# invocations (scheduled, manual, retries) join or reuse a run instead of duplicating it
+resource "aws_dynamodb_table" "audit_runs" {
+  name         = "${var.project_name}-audit-runs"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "scope"
+
+  attribute {
+    name = "scope"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+
+  server_side_encryption {
+    enabled = true
+  }
+
+  point_in_time_recovery {
+    enabled = true
+  }
+
+  tags = {
+    Name        = "${var.project_name}-audit-runs"
+    Environment = var.environment
+  }
+}
+
+# IAM policy for the run coordination table
+resource "aws_iam_policy" "dynamodb_policy" {
+  name        = "${var.project_name}-dynamodb-policy"
+  description = "Policy for coordinating audit runs"
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Action = [
+          "dynamodb:GetItem",
+          "dynamodb:PutItem"
+        ]
+        Effect   = "Allow"
+        Resource = aws_dynamodb_table.audit_runs.arn
+      }
+    ]
+  })
+}
+
+resource "aws_iam_role_policy_attachment" "dynamodb_policy_attachment" {
+  role       = aws_iam_role.lambda_role.name
+  policy_arn = aws_iam_policy.dynamodb_policy.arn
+}
+
 # Create a zip package of the application code
 data "archive_file" "lambda_package" {
   type        = "zip"
@@ -869,9 +925,11 @@ resource "aws_lambda_function" "crewai_lambda" {
 
   environment {
     variables = {
-      AWS_REGION_NAME     = var.aws_region
-      MODEL               = var.bedrock_model
-      REPORT_BUCKET_NAME  = aws_s3_bucket.audit_reports.bucket
+      AWS_REGION_NAME              = var.aws_region
+      MODEL                        = var.bedrock_model
+      REPORT_BUCKET_NAME           = aws_s3_bucket.audit_reports.bucket
+      RUN_COORDINATOR_TABLE        = aws_dynamodb_table.audit_runs.name
+      RUN_RESULT_FRESHNESS_SECONDS = tostring(var.run_result_freshness_seconds)
       # Secrets will be retrieved from Parameter Store
     }
   }
@@ -920,6 +978,181 @@ resource "aws_lambda_permission" "allow_eventbridge" {
   source_arn    = aws_cloudwatch_event_rule.daily_audit.arn
 }
 
+# Change events that kept failing, kept for inspection and redrive
+resource "aws_sqs_queue" "change_events_dlq" {
+  name                      = "${var.project_name}-change-events-dlq"
+  message_retention_seconds = 1209600  # 14 days, the SQS maximum
+  sqs_managed_sse_enabled   = true
+}
+
+# Queue that buffers CloudTrail/Config change events for targeted re-scans
+resource "aws_sqs_queue" "change_events" {
+  name                       = "${var.project_name}-change-events"
+  visibility_timeout_seconds = 6 * 300  # Six times the event function timeout, per AWS guidance
+  message_retention_seconds  = 86400
+  sqs_managed_sse_enabled    = true
+
+  redrive_policy = jsonencode({
+    deadLetterTargetArn = aws_sqs_queue.change_events_dlq.arn
+    maxReceiveCount     = var.change_event_max_receive_count
+  })
+}
+
+resource "aws_sqs_queue_redrive_allow_policy" "change_events_dlq" {
+  queue_url = aws_sqs_queue.change_events_dlq.id
+
+  redrive_allow_policy = jsonencode({
+    redrivePermission = "byQueue"
+    sourceQueueArns   = [aws_sqs_queue.change_events.arn]
+  })
+}
+
+# Event mode runs in its own function so targeted re-scans are not throttled
+# behind the single reserved slot of the full audit function
+resource "aws_lambda_function" "change_events" {
+  function_name = "${var.project_name}-change-events"
+  role          = aws_iam_role.lambda_role.arn
+  handler       = "main.change_events_handler"
+  runtime       = "python3.10"
+  timeout       = 300  # Targeted re-scans only touch the changed resources
+  memory_size   = 512
+  reserved_concurrent_executions = var.change_event_concurrency
+
+  s3_bucket = aws_s3_bucket.app_code.bucket
+  s3_key    = aws_s3_object.lambda_package.key
+
+  kms_key_arn = aws_kms_key.lambda_env_key.arn
+
+  vpc_config {
+    subnet_ids         = [aws_subnet.private_subnet_1.id, aws_subnet.private_subnet_2.id]
+    security_group_ids = [aws_security_group.lambda_sg.id]
+  }
+
+  tracing_config {
+    mode = "Active"
+  }
+
+  environment {
+    variables = {
+      AWS_REGION_NAME    = var.aws_region
+      REPORT_BUCKET_NAME = aws_s3_bucket.audit_reports.bucket
+    }
+  }
+
+  depends_on = [
+    aws_s3_object.lambda_package
+  ]
+}
+
+resource "aws_cloudwatch_log_group" "change_events_logs" {
+  name              = "/aws/lambda/${aws_lambda_function.change_events.function_name}"
+  retention_in_days = 365
+  kms_key_id        = aws_kms_key.lambda_env_key.arn
+}
+
+# EventBridge rule for security-relevant configuration changes
+resource "aws_cloudwatch_event_rule" "change_events" {
+  name        = "${var.project_name}-change-events"
+  description = "Trigger targeted re-scans on security-relevant resource changes"
+
+  event_pattern = jsonencode({
+    "$or" = [
+      {
+        "detail-type" = ["AWS API Call via CloudTrail"]
+        detail = {
+          eventName = [
+            "AuthorizeSecurityGroupIngress", "AuthorizeSecurityGroupEgress",
+            "RevokeSecurityGroupIngress", "RevokeSecurityGroupEgress",
+            "ModifySecurityGroupRules", "CreateSecurityGroup",
+            "RunInstances", "ModifyInstanceAttribute", "ModifyInstanceMetadataOptions",
+            "CreateBucket", "PutBucketPolicy", "DeleteBucketPolicy", "PutBucketAcl",
+            "PutBucketEncryption", "DeleteBucketEncryption",
+            "PutBucketPublicAccessBlock", "DeleteBucketPublicAccessBlock",
+            "CreateDBInstance", "ModifyDBInstance",
+            "CreateNetworkAclEntry", "ReplaceNetworkAclEntry", "DeleteNetworkAclEntry",
+            "CreateUser", "AttachUserPolicy", "PutUserPolicy",
+            "CreateRole", "AttachRolePolicy", "PutRolePolicy", "UpdateAssumeRolePolicy",
+            "StopLogging", "UpdateTrail", "DisableKeyRotation", "ModifySnapshotAttribute",
+            "ModifyLoadBalancerAttributes", "UpdateFunctionConfiguration20150331v2", "UpdateRestApi"
+          ]
+        }
+      },
+      {
+        "detail-type" = ["Config Configuration Item Change"]
+      }
+    ]
+  })
+}
+
+resource "aws_cloudwatch_event_target" "change_events_queue" {
+  rule      = aws_cloudwatch_event_rule.change_events.name
+  target_id = "ChangeEventsQueue"
+  arn       = aws_sqs_queue.change_events.arn
+}
+
+resource "aws_sqs_queue_policy" "change_events" {
+  queue_url = aws_sqs_queue.change_events.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect    = "Allow"
+        Principal = { Service = "events.amazonaws.com" }
+        Action    = "sqs:SendMessage"
+        Resource  = aws_sqs_queue.change_events.arn
+        Condition = {
+          ArnEquals = { "aws:SourceArn" = aws_cloudwatch_event_rule.change_events.arn }
+        }
+      }
+    ]
+  })
+}
+
+# IAM policy for consuming the change events queue
+resource "aws_iam_policy" "sqs_policy" {
+  name        = "${var.project_name}-sqs-policy"
+  description = "Policy for consuming resource change events"
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Action = [
+          "sqs:ReceiveMessage",
+          "sqs:DeleteMessage",
+          "sqs:GetQueueAttributes"
+        ]
+        Effect   = "Allow"
+        Resource = aws_sqs_queue.change_events.arn
+      }
+    ]
+  })
+}
+
+resource "aws_iam_role_policy_attachment" "sqs_policy_attachment" {
+  role       = aws_iam_role.lambda_role.name
+  policy_arn = aws_iam_policy.sqs_policy.arn
+}
+
+# Deliver change events in batches; the batching window is the coalescing window.
+# Only the messages the handler reports as failed are retried, and after
+# maxReceiveCount attempts they move to the dead-letter queue.
+resource "aws_lambda_event_source_mapping" "change_events" {
+  event_source_arn                   = aws_sqs_queue.change_events.arn
+  function_name                      = aws_lambda_function.change_events.arn
+  batch_size                         = 100
+  maximum_batching_window_in_seconds = var.change_event_window_seconds
+  function_response_types            = ["ReportBatchItemFailures"]
+
+  # Stay within the reserved concurrency so batches aren't throttled back to the queue
+  scaling_config {
+    maximum_concurrency = var.change_event_concurrency
+  }
+
+  depends_on = [aws_iam_role_policy_attachment.sqs_policy_attachment]
+}
+
 # Output the S3 bucket names and Lambda function name
 output "code_bucket_name" {
   value = aws_s3_bucket.app_code.bucket
@@ -22,3 +22,13 @@ output "cloudwatch_log_group" {
   description = "CloudWatch Log Group for Lambda function"
   value       = aws_cloudwatch_log_group.lambda_logs.name
 }
+
+output "change_events_function_name" {
+  description = "Lambda function that runs targeted re-scans from change events"
+  value       = aws_lambda_function.change_events.function_name
+}
+
+output "change_events_dlq_url" {
+  description = "Dead-letter queue for change events that repeatedly failed"
+  value       = aws_sqs_queue.change_events_dlq.id
+}
@@ -36,3 +36,32 @@ variable "serper_api_key" {
   sensitive   = true
   default     = ""
 }
+
+variable "change_event_window_seconds" {
+  description = "Seconds to buffer change events before a targeted re-scan (coalescing window)"
+  type        = number
+  default     = 60
+}
+
+variable "change_event_concurrency" {
+  description = "Reserved concurrency for the event-mode function (at least 2, the SQS event source minimum)"
+  type        = number
+  default     = 2
+
+  validation {
+    condition     = var.change_event_concurrency >= 2
+    error_message = "change_event_concurrency must be at least 2."
+  }
+}
+
+variable "change_event_max_receive_count" {
+  description = "Delivery attempts for a change event before it is moved to the dead-letter queue"
+  type        = number
+  default     = 5
+}
+
+variable "run_result_freshness_seconds" {
+  description = "Seconds a completed audit result is reused by overlapping invocations instead of re-running"
+  type        = number
+  default     = 3600
+}
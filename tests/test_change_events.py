@@ -0,0 +1,151 @@
+import os
+import json
+
+import pytest
+
+from aws_infrastructure_security_audit_and_reporting.change_events import (
+    coalesce,
+    failed_message_ids,
+    is_change_event_batch,
+    process_change_events,
+    unwrap_events,
+)
+
+EVENTS_FILE = os.path.join(os.path.dirname(__file__), '..', 'events', 'change_events.json')
+
+
+def load_events():
+    with open(EVENTS_FILE) as f:
+        return json.load(f)
+
+
+def sqs_batch(bodies):
+    return {'Records': [
+        {'messageId': f'm-{i}', 'eventSource': 'aws:sqs', 'body': body}
+        for i, body in enumerate(bodies)
+    ]}
+
+
+def test_replayed_events_are_deduplicated_and_coalesced():
+    events = load_events()
+    targets = coalesce(unwrap_events({'events': events}))
+
+    # The duplicate delivery and both changes to the security group collapse
+    # into one target; the failed DeleteBucketEncryption call is ignored
+    assert dict(targets) == {
+        ('us-east-1', 'ec2', 'security_groups'): {'sg-0123456789abcdef0'},
+        ('us-east-1', 's3', 'buckets'): {'example-data-bucket'},
+        ('us-east-1', 'rds', 'instances'): {'orders-db'},
+    }
+
+
+def test_sqs_batch_skips_unparseable_bodies():
+    events = load_events()
+    event = sqs_batch([json.dumps(events[0]), 'not json', '', '"a string"', json.dumps(events[3])])
+
+    assert is_change_event_batch(event)
+    assert unwrap_events(event) == [events[0], events[3]]
+
+
+def test_sqs_batch_without_usable_bodies_is_still_event_mode():
+    event = sqs_batch(['not json'])
+    assert is_change_event_batch(event)
+    assert coalesce(unwrap_events(event)) == {}
+
+
+def test_scheduled_audit_event_is_not_a_change_batch():
+    assert not is_change_event_batch({'inputs': {}})
+    assert not is_change_event_batch({'detail-type': 'Scheduled Event'})
+
+
+def test_failed_message_ids_maps_failed_targets_to_messages():
+    events = load_events()
+    event = sqs_batch([json.dumps(e) for e in events] + ['not json'])
+    failed = [{'region': 'us-east-1', 'service': 'ec2', 'resource_type': 'security_groups',
+               'resource_ids': ['sg-0123456789abcdef0']}]
+
+    # Every message naming the security group is retried, including the duplicate
+    assert failed_message_ids(event, failed) == ['m-0', 'm-1', 'm-2']
+    assert failed_message_ids(event, []) == []
+
+
+def client_error(code, operation):
+    from botocore.exceptions import ClientError
+    return ClientError({'Error': {'Code': code, 'Message': code}}, operation)
+
+
+class StubClient:
+    """Answers the calls a change-event re-scan makes from canned responses."""
+
+    def __init__(self, responses):
+        from botocore.exceptions import ClientError
+        self.exceptions = type('Exceptions', (), {'ClientError': ClientError})
+        self.responses = responses
+
+    def __getattr__(self, operation):
+        def call(**kwargs):
+            response = self.responses[operation]
+            if isinstance(response, Exception):
+                raise response
+            return response
+        return call
+
+
+@pytest.fixture
+def stub_aws(monkeypatch):
+    pytest.importorskip('boto3')
+    pytest.importorskip('crewai')
+    from aws_infrastructure_security_audit_and_reporting.tools import aws_infrastructure_scanner_tool
+
+    clients = {}
+
+    class Session:
+        def __init__(self, region_name=None):
+            pass
+
+        def client(self, service):
+            return clients[service]
+
+    monkeypatch.setattr(aws_infrastructure_scanner_tool.boto3, 'Session', Session)
+    return clients
+
+
+def test_throttled_target_is_reported_failed(stub_aws):
+    events = load_events()
+    stub_aws['ec2'] = StubClient({
+        'describe_security_groups': client_error('RequestLimitExceeded', 'DescribeSecurityGroups'),
+        'describe_instances': {'Reservations': []},
+    })
+    stub_aws['s3'] = StubClient({'head_bucket': client_error('404', 'HeadBucket')})
+    stub_aws['rds'] = StubClient({
+        'describe_db_instances': client_error('DBInstanceNotFound', 'DescribeDBInstances'),
+    })
+
+    result = process_change_events({'events': events})
+
+    # The deleted bucket and database are simply gone; only the throttled group is retried
+    assert result['failed_targets'] == [{'region': 'us-east-1', 'service': 'ec2',
+                                         'resource_type': 'security_groups',
+                                         'resource_ids': ['sg-0123456789abcdef0']}]
+    assert result['resources_scanned'] == 0
+    assert result['findings'] == []
+
+
+def test_bucket_policy_change_reports_public_bucket(stub_aws):
+    bucket_policy_event = load_events()[3]
+    stub_aws['s3'] = StubClient({
+        'head_bucket': {},
+        'get_bucket_encryption': {'ServerSideEncryptionConfiguration': {'Rules': []}},
+        'get_bucket_policy_status': {'PolicyStatus': {'IsPublic': True}},
+        'get_public_access_block': client_error('NoSuchPublicAccessBlockConfiguration',
+                                                'GetPublicAccessBlock'),
+        'get_bucket_acl': {'Grants': []},
+    })
+
+    result = process_change_events({'events': [bucket_policy_event]})
+
+    assert result['failed_targets'] == []
+    assert result['resources_scanned'] == 1
+    assert {f['rule_id'] for f in result['findings']} == {
+        'S3.BUCKET.POLICY_PUBLIC', 'S3.BUCKET.PUBLIC_ACCESS_NOT_BLOCKED',
+    }
@@ -0,0 +1,111 @@
+import pytest
+
+from aws_infrastructure_security_audit_and_reporting.tools.collectors import (
+    COLLECTORS,
+    GLOBAL,
+    ResourceCall,
+    plan_scan,
+    scope_region,
+)
+
+
+class ClientError(Exception):
+    def __init__(self, code):
+        super().__init__(code)
+        self.response = {'Error': {'Code': code}}
+
+
+class StubClient:
+    """Records calls and answers them from canned responses."""
+
+    exceptions = type('Exceptions', (), {'ClientError': ClientError})
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+
+    def __getattr__(self, operation):
+        def call(**kwargs):
+            self.calls.append((operation, kwargs))
+            response = self.responses[operation]
+            if isinstance(response, Exception):
+                raise response
+            return response
+        return call
+
+
+class StubSession:
+    def __init__(self, client):
+        self._client = client
+
+    def client(self, service):
+        return self._client
+
+
+def test_plan_scan_schedules_global_services_once():
+    assert plan_scan(['s3', 'ec2', 'iam'], ['us-east-1', 'eu-west-1']) == [
+        ('s3', 'us-east-1'),
+        ('ec2', 'us-east-1'),
+        ('ec2', 'eu-west-1'),
+        ('iam', 'us-east-1'),
+    ]
+
+
+def test_scope_region_labels_global_services():
+    assert scope_region('s3', 'eu-west-1') == GLOBAL
+    assert scope_region('iam', 'eu-west-1') == GLOBAL
+    assert scope_region('rds', 'eu-west-1') == 'eu-west-1'
+
+
+def test_prepare_all_skips_items_whose_follow_up_fails():
+    def transform(client, item):
+        if item['Id'] == 'b':
+            raise ClientError('AccessDenied')
+        return dict(item, Extra=True)
+
+    call = ResourceCall('things', 'list_things', 'Things', ('Id',), transform=transform, fields=('Id', 'Extra'))
+    items = [{'Id': 'a', 'Noise': 1}, {'Id': 'b'}, {'Id': 'c'}]
+    assert call.prepare_all(None, items) == [{'Id': 'a', 'Extra': True}, {'Id': 'c', 'Extra': True}]
+
+
+@pytest.mark.parametrize('origin, rotation_checked', [
+    ('AWS_KMS', True),
+    ('EXTERNAL', False),
+    ('AWS_CLOUDHSM', False),
+])
+def test_key_rotation_is_only_read_for_kms_generated_material(origin, rotation_checked):
+    client = StubClient({
+        'describe_key': {'KeyMetadata': {'KeyId': 'k-1', 'KeyManager': 'CUSTOMER',
+                                         'KeySpec': 'SYMMETRIC_DEFAULT', 'Origin': origin}},
+        'get_key_rotation_status': {'KeyRotationEnabled': True},
+    })
+    resources = COLLECTORS['kms'].lookup(StubSession(client), 'keys', ['k-1'])['keys']
+    assert ('KeyRotationEnabled' in resources[0]) is rotation_checked
+    assert [op for op, _ in client.calls].count('get_key_rotation_status') == int(rotation_checked)
+
+
+def test_aws_managed_keys_skip_rotation_status():
+    client = StubClient({
+        'describe_key': {'KeyMetadata': {'KeyId': 'k-1', 'KeyManager': 'AWS',
+                                         'KeySpec': 'SYMMETRIC_DEFAULT', 'Origin': 'AWS_KMS'}},
+    })
+    assert 'KeyRotationEnabled' not in COLLECTORS['kms'].lookup(StubSession(client), 'keys', ['k-1'])['keys'][0]
+
+
+def test_trails_are_listed_without_shadow_copies():
+    trail = {'Name': 'org', 'TrailARN': 'arn:aws:cloudtrail:us-east-1:123:trail/org',
+             'HomeRegion': 'us-east-1', 'IsMultiRegionTrail': True}
+    client = StubClient({'describe_trails': {'trailList': [trail]},
+                         'get_trail_status': {'IsLogging': True}})
+    pages = list(COLLECTORS['cloudtrail'].iter_pages(StubSession(client)))
+    assert pages == [('trails', [dict(trail, IsLogging=True)])]
+    assert client.calls[0] == ('describe_trails', {'includeShadowTrails': False})
+
+
+def test_lookup_skips_deleted_resources_and_raises_other_errors():
+    deleted = StubClient({'describe_security_groups': ClientError('InvalidGroup.NotFound')})
+    assert COLLECTORS['ec2'].lookup(StubSession(deleted), 'security_groups', ['sg-1']) == {'security_groups': []}
+
+    throttled = StubClient({'describe_security_groups': ClientError('RequestLimitExceeded')})
+    with pytest.raises(ClientError):
+        COLLECTORS['ec2'].lookup(StubSession(throttled), 'security_groups', ['sg-1'])
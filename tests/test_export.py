@@ -0,0 +1,60 @@
+import os
+
+import pytest
+
+pytest.importorskip('pyarrow')
+pytest.importorskip('boto3')
+pytest.importorskip('crewai')
+
+from aws_infrastructure_security_audit_and_reporting.export import export_audit_data  # noqa: E402
+
+
+class Entry:
+    service = 'ec2'
+    region = 'us-east-1'
+    error = None
+
+    def __init__(self, records):
+        self.store = records
+
+
+class StubScanner:
+    def __init__(self, records):
+        self.inventory = self
+        self._records = records
+
+    def collect_all(self, regions, deadline=None):
+        pass
+
+    def entries(self):
+        return [Entry(self._records)]
+
+
+def records(n, fail=False):
+    for i in range(n):
+        yield {'service': 'ec2', 'resource_type': 'instances', 'resource_id': f'i-{i}',
+               'resource': {'InstanceId': f'i-{i}'}}
+    if fail:
+        raise RuntimeError('inventory read failed')
+
+
+def parquet_files(root):
+    return sorted(
+        os.path.relpath(os.path.join(d, f), root) for d, _, files in os.walk(root) for f in files
+    )
+
+
+def test_export_writes_partitioned_inventory(tmp_path):
+    paths = export_audit_data(str(tmp_path), scanner=StubScanner(records(3)),
+                              region='us-east-1', account_id='123456789012')
+    assert sorted(os.path.relpath(p, tmp_path) for p in paths) == parquet_files(tmp_path)
+    assert any(f.startswith(os.path.join('inventory', 'account_id=123456789012', 'region=us-east-1'))
+               for f in parquet_files(tmp_path))
+
+
+def test_failed_export_closes_and_removes_partial_files(tmp_path):
+    # More rows than one batch, so a row group is on disk when the read fails
+    with pytest.raises(RuntimeError):
+        export_audit_data(str(tmp_path), scanner=StubScanner(records(1500, fail=True)),
+                          region='us-east-1', account_id='123456789012')
+    assert parquet_files(tmp_path) == []
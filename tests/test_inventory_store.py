@@ -0,0 +1,127 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+from aws_infrastructure_security_audit_and_reporting.inventory_store import InventoryStore, ScanInventory
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..', 'src')
+
+# Peak RSS allowed for spilling and reading back an inventory, interpreter included
+PEAK_RSS_BOUND_MB = 64
+
+# Run in a fresh interpreter so the peak reflects only the store, not pytest.
+# VmHWM is reset by exec, unlike ru_maxrss, which keeps the forking parent's peak.
+SPILL_SCRIPT = """
+import sys
+from aws_infrastructure_security_audit_and_reporting.inventory_store import InventoryStore
+
+n = int(sys.argv[1])
+with InventoryStore() as store:
+    for i in range(n):
+        store.append({
+            'service': 'ec2',
+            'resource_type': 'instances',
+            'resource_id': f'i-{i:017x}',
+            'resource': {
+                'InstanceId': f'i-{i:017x}',
+                'InstanceType': 'm5.large',
+                'PrivateIpAddress': f'10.0.{i // 256 % 256}.{i % 256}',
+                'Tags': [{'Key': 'Name', 'Value': f'instance-{i}'}, {'Key': 'team', 'Value': 'platform'}],
+            },
+        })
+    assert sum(1 for _ in store) == n
+    assert store[n - 1]['resource_id'] == f'i-{n - 1:017x}'
+with open('/proc/self/status') as status:
+    peak_kb = next(int(line.split()[1]) for line in status if line.startswith('VmHWM:'))
+print(peak_kb / 1024)
+"""
+
+
+def record(i):
+    return {'service': 'ec2', 'resource_type': 'instances', 'resource_id': f'i-{i}', 'resource': {'n': i}}
+
+
+def peak_rss_mb(n, tmp_path):
+    env = dict(os.environ, PYTHONPATH=SRC_DIR, INVENTORY_STORE_DIR=str(tmp_path))
+    output = subprocess.run(
+        [sys.executable, '-c', SPILL_SCRIPT, str(n)],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip())
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/status'), reason="needs Linux /proc for peak RSS")
+def test_peak_rss_stays_bounded_as_inventory_grows(tmp_path):
+    n = 20000
+    small = peak_rss_mb(n, tmp_path)
+    large = peak_rss_mb(10 * n, tmp_path)
+    assert small < PEAK_RSS_BOUND_MB
+    assert large < PEAK_RSS_BOUND_MB
+    assert os.listdir(tmp_path) == []
+
+
+def test_index_and_iteration_round_trip(tmp_path):
+    with InventoryStore(str(tmp_path)) as store:
+        store.extend(record(i) for i in range(1000))
+        assert len(store) == 1000
+        assert store[0] == record(0)
+        assert store[999] == record(999)
+        assert store[-1] == record(999)
+        assert list(store) == [record(i) for i in range(1000)]
+        path = store.path
+    assert not os.path.exists(path)
+
+
+def test_empty_store(tmp_path):
+    with InventoryStore(str(tmp_path)) as store:
+        assert len(store) == 0
+        assert list(store) == []
+        with pytest.raises(IndexError):
+            store[0]
+
+
+def test_append_during_iteration(tmp_path):
+    with InventoryStore(str(tmp_path)) as store:
+        store.extend(record(i) for i in range(10))
+        seen = []
+        for item in store:
+            seen.append(item)
+            store.append(record(100 + len(seen)))
+            # Random access remaps the log; the running iterator keeps its view
+            assert store[len(store) - 1] == record(100 + len(seen))
+        assert seen == [record(i) for i in range(10)]
+        assert len(store) == 20
+        assert list(store)[10:] == [record(100 + i) for i in range(1, 11)]
+
+
+def test_scan_inventory_collects_each_service_once(tmp_path):
+    calls = []
+
+    def pages():
+        calls.append(1)
+        yield 'security_groups', [{'GroupId': f'sg-{i}'} for i in range(8)]
+        yield 'security_groups', [{'GroupId': 'sg-8'}]
+
+    with ScanInventory(sample_size=3, directory=str(tmp_path)) as inventory:
+        entry = inventory.collect('ec2', 'us-east-1', pages)
+        assert inventory.collect('ec2', 'us-east-1', pages) is entry
+        assert len(calls) == 1
+        assert entry.summary() == {
+            'security_groups': [{'GroupId': 'sg-0'}, {'GroupId': 'sg-1'}, {'GroupId': 'sg-2'}],
+            'resource_counts': {'security_groups': 9},
+        }
+        assert [r['resource_id'] for r in entry.store] == [f'sg-{i}' for i in range(9)]
+    assert os.listdir(tmp_path) == []
+
+
+def test_scan_inventory_keeps_partial_results_on_error(tmp_path):
+    def pages():
+        yield 'buckets', [{'name': 'a'}]
+        raise RuntimeError('AccessDenied')
+
+    with ScanInventory(directory=str(tmp_path)) as inventory:
+        entry = inventory.collect('s3', 'us-east-1', pages)
+        assert entry.summary()['resource_counts'] == {'buckets': 1}
+        assert 'AccessDenied' in entry.summary()['error']
@@ -0,0 +1,115 @@
+import time
+import threading
+
+import pytest
+
+pytest.importorskip('crewai')
+pytest.importorskip('boto3')
+
+from aws_infrastructure_security_audit_and_reporting import llm_router
+from aws_infrastructure_security_audit_and_reporting.llm_router import LatencyTracker, LLMBackend, LLMRouter
+
+
+@pytest.fixture
+def router(monkeypatch):
+    monkeypatch.setattr(LLMBackend, '_probe', lambda self: None)
+    monkeypatch.setenv('MODEL', 'mock')
+    monkeypatch.setenv('MODEL_REPORT_WRITER', 'bedrock/writer')
+    monkeypatch.setenv('LLM_FALLBACK_MODELS', 'ollama/a,ollama/b')
+    monkeypatch.setenv('LLM_TIMEOUT_SECONDS', '0.2')
+    monkeypatch.setenv('LLM_LATENCY_BUDGET_SECONDS', '1')
+    monkeypatch.setenv('LLM_MAX_IN_FLIGHT_PER_BACKEND', '1')
+    return LLMRouter(['security_analyst', 'report_writer'])
+
+
+def specs(backends):
+    return [backend.spec for backend in backends]
+
+
+def test_percentiles_use_nearest_rank():
+    tracker = LatencyTracker()
+    assert tracker.percentile(50) is None
+    for value in range(10, 0, -1):
+        tracker.record(float(value))
+    assert tracker.percentile(50) == 5.0
+    assert tracker.percentile(95) == 10.0
+    assert tracker.percentile(0) == 1.0
+    assert len(tracker) == 10
+
+
+def test_old_samples_expire():
+    tracker = LatencyTracker(window_seconds=0.05)
+    tracker.record(3.0)
+    time.sleep(0.1)
+    assert tracker.percentile(50) is None
+
+
+def test_route_prefers_assigned_then_fastest_measured(router):
+    assert specs(router.route('security_analyst')) == ['mock', 'bedrock/writer', 'ollama/a', 'ollama/b']
+
+    router.backends['ollama/b'].latency.record(0.1)
+    router.backends['ollama/a'].latency.record(0.5)
+    assert specs(router.route('report_writer')) == ['bedrock/writer', 'ollama/b', 'ollama/a', 'mock']
+
+
+def test_route_demotes_over_budget_and_skips_unavailable(router):
+    router.backends['mock'].latency.record(5.0)
+    router.backends['ollama/a'].healthy = False
+    router.backends['ollama/b'].retry_after = time.monotonic() + 60
+    assert specs(router.route('security_analyst')) == ['bedrock/writer', 'mock']
+
+
+def test_stop_words_reach_the_backend(router):
+    from crewai.llms.base_llm import call_stop_override
+
+    seen = []
+    router.backends['mock'].call = lambda messages, stop=None, **kwargs: seen.append(stop) or 'ok'
+    llm = router.llm_for('security_analyst')
+    with call_stop_override(llm, ['\nObservation:']):
+        assert llm.call([{'role': 'user', 'content': 'hi'}]) == 'ok'
+    assert seen == [['\nObservation:']]
+
+
+def test_backend_output_is_cut_at_stop_words():
+    assert llm_router._truncate_at_stop('Action: x\nObservation: made up', ['\nObservation:']) == 'Action: x'
+    assert llm_router._truncate_at_stop('Final Answer: done', ['\nObservation:']) == 'Final Answer: done'
+
+
+def test_connection_errors_fail_over_and_cool_down(router):
+    def refuse(messages, **kwargs):
+        raise ConnectionRefusedError('refused')
+
+    router.backends['mock'].call = refuse
+    router.backends['bedrock/writer'].call = lambda messages, **kwargs: 'fallback'
+    assert router.invoke('security_analyst', []) == 'fallback'
+    assert not router.backends['mock'].available()
+    assert 'mock' not in specs(router.route('security_analyst'))
+
+
+def test_other_errors_are_not_swallowed(router):
+    def broken(messages, **kwargs):
+        raise ValueError('bad request')
+
+    router.backends['mock'].call = broken
+    with pytest.raises(ValueError):
+        router.invoke('security_analyst', [])
+
+
+def test_hung_backend_is_skipped_while_its_slots_are_full(router):
+    release = threading.Event()
+    calls = []
+
+    def hang(messages, **kwargs):
+        calls.append(1)
+        release.wait(5)
+        return 'late'
+
+    router.backends['mock'].call = hang
+    router.backends['bedrock/writer'].call = lambda messages, **kwargs: 'fallback'
+    try:
+        assert router.invoke('security_analyst', []) == 'fallback'
+        # The abandoned call still holds mock's only slot, so it isn't called again
+        assert router.invoke('security_analyst', []) == 'fallback'
+        assert len(calls) == 1
+    finally:
+        release.set()
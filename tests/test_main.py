@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+pytest.importorskip('boto3')
+pytest.importorskip('crewai')
+
+import main  # noqa: E402
+from aws_infrastructure_security_audit_and_reporting.run_coordinator import RunClaim  # noqa: E402
+
+
+class StubCoordinator:
+    def __init__(self):
+        self.calls = []
+
+    def begin(self, scope, owner, force=False):
+        self.calls.append('begin')
+        return RunClaim('acquired', {'owner': owner})
+
+    def complete(self, scope, owner, locations):
+        self.calls.append('complete')
+        raise RuntimeError('ConditionalCheckFailed')
+
+    def abandon(self, scope, owner):
+        self.calls.append('abandon')
+
+
+class StubCrew:
+    """Stands in for both the crew class and its ``crew()`` and scanner."""
+
+    def __init__(self):
+        self.scanner = self
+        self.inventory = self
+
+    def crew(self):
+        return self
+
+    def kickoff(self, inputs):
+        return 'report'
+
+    def close(self):
+        pass
+
+
+class StubS3:
+    def put_object(self, **kwargs):
+        pass
+
+
+def test_completion_failure_after_upload_is_not_an_audit_failure(monkeypatch):
+    coordinator = StubCoordinator()
+    monkeypatch.setattr(main, 'RunCoordinator', lambda: coordinator)
+    monkeypatch.setattr(main, 'AwsInfrastructureSecurityAuditAndReportingCrew', StubCrew)
+    monkeypatch.setattr(main, 'export_audit_data', lambda *args, **kwargs: [])
+    monkeypatch.setattr(main.boto3, 'client', lambda service: StubS3())
+
+    response = main.lambda_handler({'inputs': {}}, None)
+
+    assert response['statusCode'] == 200
+    assert json.loads(response['body'])['report_location'].startswith('s3://')
+    assert coordinator.calls == ['begin', 'complete']
@@ -0,0 +1,46 @@
+import time
+
+import pytest
+
+pytest.importorskip('boto3')
+
+from aws_infrastructure_security_audit_and_reporting.run_coordinator import LocalRunStore, RunCoordinator
+
+
+@pytest.fixture
+def coordinator(tmp_path, monkeypatch):
+    monkeypatch.delenv('RUN_COORDINATOR_TABLE', raising=False)
+    monkeypatch.setenv('RUN_POLL_SECONDS', '0.01')
+    return RunCoordinator(LocalRunStore(str(tmp_path)))
+
+
+def test_live_lease_is_reported_in_flight(coordinator):
+    assert coordinator.begin('scope', 'a').state == 'acquired'
+    assert coordinator.begin('scope', 'b').state == 'in_flight'
+    assert coordinator.join('scope', 'b', timeout=60).state == 'in_flight'
+
+
+def test_failed_run_is_taken_over(coordinator):
+    coordinator.begin('scope', 'a')
+    assert coordinator.begin('scope', 'b').state == 'in_flight'
+    coordinator.abandon('scope', 'a')
+    claim = coordinator.join('scope', 'b', timeout=60)
+    assert claim.state == 'acquired'
+    assert claim.record['owner'] == 'b'
+
+
+def test_expired_lease_is_taken_over(coordinator):
+    coordinator.lease_seconds = 0
+    coordinator.begin('scope', 'a')
+    time.sleep(1)
+    assert coordinator.join('scope', 'b', timeout=60).state == 'acquired'
+
+
+def test_join_waits_for_completion_when_enabled(coordinator):
+    coordinator.join_wait_seconds = 5
+    coordinator.begin('scope', 'a')
+    coordinator.complete('scope', 'a', {'report_location': 's3://bucket/report.md'})
+    claim = coordinator.join('scope', 'b', timeout=60)
+    assert claim.state == 'fresh'
+    assert coordinator.result_of(claim.record) == {'report_location': 's3://bucket/report.md'}
+    assert coordinator.join('scope', 'b', force=True, timeout=60).state == 'acquired'
@@ -0,0 +1,48 @@
+import logging
+from datetime import datetime, timezone
+
+import pytest
+
+from aws_infrastructure_security_audit_and_reporting import serialization
+from aws_infrastructure_security_audit_and_reporting.serialization import JSONSerializer, get_serializer
+
+
+@pytest.mark.parametrize('backend', ['yaml', 'ORJSON ', ''])
+def test_backend_names_never_raise(monkeypatch, backend):
+    monkeypatch.setenv('JSON_BACKEND', backend)
+    assert isinstance(get_serializer(), JSONSerializer)
+
+
+def test_unknown_backend_falls_back_to_stdlib(monkeypatch, caplog):
+    monkeypatch.setenv('JSON_BACKEND', 'yaml')
+    with caplog.at_level(logging.WARNING):
+        chosen = get_serializer()
+    assert type(chosen) is JSONSerializer
+    assert 'Unknown JSON backend' in caplog.text
+
+
+def test_missing_backend_falls_back_to_stdlib(monkeypatch, caplog):
+    monkeypatch.setitem(serialization.AVAILABLE, 'msgspec', False)
+    with caplog.at_level(logging.WARNING):
+        chosen = get_serializer('msgspec')
+    assert type(chosen) is JSONSerializer
+    assert 'not installed' in caplog.text
+
+
+# msgspec writes UTC as 'Z'; the others match datetime.isoformat()
+UTC_SUFFIX = {'stdlib': '+00:00', 'orjson': '+00:00', 'msgspec': 'Z'}
+
+
+@pytest.mark.parametrize('name', [n for n, available in serialization.AVAILABLE.items() if available])
+def test_round_trip(name):
+    backend = get_serializer(name)
+    data = {'id': 'i-1', 'launched': datetime(2026, 1, 1, tzinfo=timezone.utc), 'tags': [1, 2]}
+    assert backend.loads(backend.dumps_bytes(data)) == {
+        'id': 'i-1', 'launched': '2026-01-01T00:00:00' + UTC_SUFFIX[name], 'tags': [1, 2]
+    }
+
+
+def test_auto_output_matches_stdlib(monkeypatch):
+    monkeypatch.setitem(serialization.AVAILABLE, 'msgspec', True)
+    monkeypatch.delenv('JSON_BACKEND', raising=False)
+    assert get_serializer().name in ('orjson', 'stdlib')